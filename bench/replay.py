@@ -0,0 +1,247 @@
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from asyncio import gather, new_event_loop
+from collections import Counter
+from json import dumps, loads
+from math import ceil
+from multiprocessing import get_context
+from multiprocessing.synchronize import Event as ProcessEvent
+from multiprocessing.sharedctypes import Synchronized
+from pathlib import Path
+from random import choice
+from resource import RUSAGE_SELF, getrusage
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import monotonic, sleep, time
+
+sys_path.insert(0, str(Path(__file__).resolve().parent))
+sys_path.insert(1, str(Path(__file__).resolve().parent.parent))
+
+from exrc import ListingSort  # noqa: E402
+
+from exmb import _main  # noqa: E402
+from exmb._resolver import resolvers  # noqa: E402
+from standins import SOURCE_HOSTS, UPLOAD_HOSTS, RedditStandIn, SourceStandIn, \
+    StandInReddit, StandInVHP, UploadStandIn, post_json  # noqa: E402
+
+PROC_STATUS = Path("/proc/self/status")
+SUBREDDIT = "bench"
+
+
+def load_traffic(args: Namespace):
+    if args.traffic is None:
+        return [(index * 60 / args.rate, choice(SOURCE_HOSTS), f"Synthetic post {index}")
+                for index in range(args.posts)]
+
+    with args.traffic.open(mode="r") as traffic_stream:
+        recorded = [loads(line) for line in traffic_stream if line.strip()]
+
+    recorded.sort(key=lambda post: post["created_utc"])
+    traffic: list[tuple[float, str, str]] = []
+
+    for post in recorded:
+        match = resolvers.match(post["url"])
+
+        if match is None:
+            continue
+
+        host, _, _ = match
+        traffic.append(((post["created_utc"] - recorded[0]["created_utc"]) / args.speed, host,
+                        post["title"]))
+
+    return traffic[:args.posts] if args.posts is not None else traffic
+
+
+def sample_anonymous_rss(peak_anonymous_rss: Synchronized[int], stop: ProcessEvent):
+    # ru_maxrss also counts the mmap'd media pages, which are page cache rather than bot memory.
+    while PROC_STATUS.exists() and not stop.wait(.01):
+        for line in PROC_STATUS.read_text().splitlines():
+            if line.startswith("RssAnon:"):
+                peak_anonymous_rss.value = max(peak_anonymous_rss.value, int(line.split()[1]))
+
+
+def parse_overrides(overrides: list[str], services: list[str]):
+    values: dict[str, float] = {}
+
+    for override in overrides:
+        service, _, value = override.partition("=")
+
+        if service not in services:
+            raise ValueError(f"Unknown stand-in service {service}!")
+
+        values[service] = float(value)
+
+    return values
+
+
+def percentile(values: list[float], ratio: float):
+    if len(values) == 0:
+        return None
+
+    ordered = sorted(values)
+    return ordered[max(0, ceil(ratio * len(ordered)) - 1)]
+
+
+def record_traffic(args: Namespace):
+    reddit, _, _, _ = _main.load_clients(Namespace(alias=args.alias, user_agent=args.user_agent,
+                                                   action="record"))
+    posts_json = reddit.posts(subreddit=args.subreddit, sort=ListingSort.NEW,
+                              limit=args.limit).json()
+
+    with args.output.open(mode="w") as traffic_stream:
+        for post in reversed(posts_json["data"]["children"]):
+            if resolvers.match(post["data"]["url"]) is None:
+                continue
+
+            traffic_stream.write(dumps({"created_utc": post["data"]["created_utc"],
+                                        "title": post["data"]["title"],
+                                        "url": post["data"]["url"]}) + "\n")
+
+
+def run_bot_process(reddit_url: str, source_url: str, upload_urls: dict[str, str],
+                    config_path: str, bot_argv: list[str], stop: ProcessEvent,
+                    peak_rss: Synchronized[int], peak_anonymous_rss: Synchronized[int]):
+    Thread(target=sample_anonymous_rss, args=(peak_anonymous_rss, stop), daemon=True).start()
+    _main.__config_path__ = Path(config_path)
+    argv[1:] = bot_argv
+    bot_args = _main.parse_program_args()
+    reddit_client, vhp = StandInReddit(reddit_url), StandInVHP(source_url, upload_urls)
+
+    if bot_args.async_mode:
+        loop = new_event_loop()
+        bot_task = loop.create_task(_main.run_bot_async(reddit_client, vhp, bot_args))
+
+        def cancel_bot():
+            stop.wait()
+            loop.call_soon_threadsafe(bot_task.cancel)
+
+        Thread(target=cancel_bot, daemon=True).start()
+        loop.run_until_complete(gather(bot_task, return_exceptions=True))
+
+    else:
+        _main.run_bot(reddit_client, vhp, bot_args, stop=stop)
+
+    peak_rss.value = getrusage(RUSAGE_SELF).ru_maxrss
+
+
+def replay_traffic(args: Namespace):
+    services = ["reddit", "source", *UPLOAD_HOSTS]
+    latencies = parse_overrides(args.latency, services)
+    failure_rates = parse_overrides(args.failure_rate, services)
+    reddit = RedditStandIn(SUBREDDIT, latency=latencies.get("reddit", 0.),
+                           failure_rate=failure_rates.get("reddit", 0.))
+    source = SourceStandIn(args.file_size, latency=latencies.get("source", 0.),
+                           failure_rate=failure_rates.get("source", 0.))
+    uploads = {host: UploadStandIn(host, latency=latencies.get(host, 0.),
+                                   failure_rate=failure_rates.get(host, 0.))
+               for host in UPLOAD_HOSTS}
+    servers = [reddit.server, source.server, *(upload.server for upload in uploads.values())]
+    traffic = load_traffic(args)
+
+    for server in servers:
+        server.start()
+
+    seed = post_json(SUBREDDIT, 0, "streamable", "Seed post")
+    seed["data"]["url"] = "https://example.com/seed"
+    reddit.release(seed)
+
+    # The bot runs in its own process so its peak RSS is not inflated by the stand-in servers.
+    context = get_context("spawn")
+    stop = context.Event()
+    peak_rss = context.Value("q", 0)
+    peak_anonymous_rss = context.Value("q", 0)
+
+    with TemporaryDirectory() as config_path:
+        bot = context.Process(target=run_bot_process, name="bench-bot",
+                              args=(reddit.server.url, source.server.url,
+                                    {host: upload.server.url for host, upload in uploads.items()},
+                                    config_path, ["run-bot", "bench", SUBREDDIT, *args.bot_args],
+                                    stop, peak_rss, peak_anonymous_rss))
+        bot.start()
+
+        while reddit.server.requests["reddit:listing"] == 0 and bot.is_alive():
+            sleep(.01)
+
+        started = monotonic()
+
+        for index, (offset, host, title) in enumerate(traffic, start=1):
+            sleep(max(0., started + offset - monotonic()))
+            reddit.release(post_json(SUBREDDIT, index, host, title))
+
+        deadline = monotonic() + args.drain_timeout
+
+        while len(reddit.comment_times) < len(traffic) and monotonic() < deadline and \
+                bot.is_alive():
+            sleep(.1)
+
+        finished = time()
+        stop.set()
+        bot.join()
+
+    times_to_comment = [reddit.comment_times[name] - released
+                        for name, released in reddit.release_times.items()
+                        if name in reddit.comment_times]
+    requests: Counter[str] = Counter()
+
+    for server in servers:
+        requests += server.requests
+        server.shutdown()
+
+    elapsed = finished - min(reddit.release_times.values())
+    p50, p99 = percentile(times_to_comment, .5), percentile(times_to_comment, .99)
+    report = [
+        f"posts replayed: {len(traffic)}",
+        f"posts commented: {len(times_to_comment)}",
+        f"posts/minute: {len(times_to_comment) / elapsed * 60:.2f}",
+        f"time-to-comment p50: {p50:.3f}s" if p50 is not None else "time-to-comment p50: n/a",
+        f"time-to-comment p99: {p99:.3f}s" if p99 is not None else "time-to-comment p99: n/a",
+        f"peak RSS (bot): {peak_rss.value / 1024:.1f} MiB",
+        f"peak anonymous RSS (bot): {peak_anonymous_rss.value / 1024:.1f} MiB"
+        if peak_anonymous_rss.value > 0 else "peak anonymous RSS (bot): n/a",
+        "requests:",
+        *(f"  {endpoint}: {count}" for endpoint, count in sorted(requests.items())),
+    ]
+
+    print("\n".join(report))
+
+    if args.output is not None:
+        args.output.write_text("\n".join(report) + "\n")
+
+
+def parse_bench_args():
+    parser = ArgumentParser()
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    record_parser = subparsers.add_parser("record")
+    record_parser.add_argument("alias")
+    record_parser.add_argument("subreddit")
+    record_parser.add_argument("output", type=Path)
+    record_parser.add_argument("--limit", type=int, default=100)
+    record_parser.add_argument("--user-agent")
+    replay_parser = subparsers.add_parser("replay")
+    replay_parser.add_argument("--traffic", type=Path)
+    replay_parser.add_argument("--posts", type=int)
+    replay_parser.add_argument("--rate", type=float, default=30.)
+    replay_parser.add_argument("--speed", type=float, default=1.)
+    replay_parser.add_argument("--file-size", type=int, default=2 * 1024 * 1024)
+    replay_parser.add_argument("--latency", action="append", default=[])
+    replay_parser.add_argument("--failure-rate", action="append", default=[])
+    replay_parser.add_argument("--drain-timeout", type=float, default=300.)
+    replay_parser.add_argument("--output", type=Path)
+    replay_parser.add_argument("bot_args", nargs="*")
+    args = parser.parse_args()
+
+    if args.action == "replay" and args.traffic is None and args.posts is None:
+        args.posts = 50
+
+    return args
+
+
+if __name__ == "__main__":
+    bench_args = parse_bench_args()
+
+    if bench_args.action == "record":
+        record_traffic(bench_args)
+
+    else:
+        replay_traffic(bench_args)
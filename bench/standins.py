@@ -0,0 +1,403 @@
+from __future__ import annotations
+from collections import Counter
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from json import dumps, loads
+from pathlib import PurePosixPath
+from random import random
+from re import Match, Pattern, compile as re_compile
+from threading import Lock, Thread
+from time import sleep, time
+from typing import Any, BinaryIO, Callable
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import Request, urlopen
+
+from httpx import HTTPStatusError
+
+CONTACT_POST_NAME = re_compile(r"post%20(t3_\w+)")
+REQUEST_TIMEOUT = 30.
+SOURCE_HOSTS = ("gfycat", "imgur", "streamable", "streamff", "streamja")
+UPLOAD_HOSTS = ("streamable", "streamff", "streamja")
+
+Route = Callable[["StandInHandler", Match[str], bytes], tuple[int, Any]]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+
+    def __handle(self, method: str):
+        path = urlparse(self.path).path
+        body = read_chunked(self.rfile) \
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked" \
+            else self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        for route_method, pattern, name, route in self.server.routes:
+            if route_method != method or (match := pattern.fullmatch(path)) is None:
+                continue
+
+            self.server.count(name)
+
+            if self.server.latency > 0:
+                sleep(self.server.latency)
+
+            if random() < self.server.failure_rate:
+                self.__respond(503, {"error": "stand-in failure"})
+                return
+
+            status, payload = route(self, match, body)
+            self.__respond(status, payload)
+            return
+
+        self.server.count("not_found")
+        self.__respond(404, {"error": "not found"})
+
+    def __respond(self, status: int, payload: Any):
+        body = payload if isinstance(payload, bytes) else dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream" if isinstance(payload, bytes)
+                         else "application/json")
+        self.send_header("Content-Length", str(len(body)))
+
+        for key, value in self.server.headers.items():
+            self.send_header(key, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    @property
+    def query(self):
+        return {key: values[-1] for key, values in parse_qs(urlparse(self.path).query).items()}
+
+    def do_GET(self):
+        self.__handle("GET")
+
+    def do_POST(self):
+        self.__handle("POST")
+
+    def log_message(self, *_):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service: str, latency: float = 0., failure_rate: float = 0.):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.__lock = Lock()
+        self.failure_rate = failure_rate
+        self.headers: dict[str, str] = {}
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.routes: list[tuple[str, Pattern[str], str, Route]] = []
+        self.service = service
+
+    def count(self, name: str):
+        with self.__lock:
+            self.requests[f"{self.service}:{name}"] += 1
+
+    def route(self, method: str, pattern: str, name: str):
+        def decorator(route: Route):
+            self.routes.append((method, re_compile(pattern), name, route))
+            return route
+
+        return decorator
+
+    def start(self):
+        Thread(target=self.serve_forever, name=f"standin-{self.service}", daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class StandInResponse:
+    def __init__(self, status_code: int, headers: dict[str, str], content: bytes):
+        self.content = content
+        self.headers = headers
+        self.status_code = status_code
+
+    def json(self):
+        return loads(self.content)
+
+
+class RedditStandIn:
+    def __init__(self, subreddit: str, latency: float = 0., failure_rate: float = 0.):
+        self.__lock = Lock()
+        self.__posts: list[dict[str, Any]] = []
+        self.comment_times: dict[str, float] = {}
+        self.release_times: dict[str, float] = {}
+        self.server = StandInServer("reddit", latency=latency, failure_rate=failure_rate)
+        self.server.headers |= {"X-Ratelimit-Remaining": "600", "X-Ratelimit-Reset": "600",
+                                "X-Ratelimit-Used": "0"}
+        self.subreddit = subreddit
+
+        @self.server.route("GET", r"/r/([^/]+)/new", "listing")
+        def listing(handler: StandInHandler, match: Match[str], body: bytes):
+            before, limit = handler.query.get("before"), int(handler.query.get("limit", 25))
+
+            with self.__lock:
+                names = [post["data"]["name"] for post in self.__posts]
+
+                if before in names:
+                    index = names.index(before)
+                    posts = self.__posts[max(0, index - limit):index]
+
+                else:
+                    posts = [] if before is not None else self.__posts[:limit]
+
+            return 200, listing_json(posts)
+
+        @self.server.route("GET", r"/api/info", "info")
+        def info(handler: StandInHandler, match: Match[str], body: bytes):
+            ids = handler.query.get("id", "").split(",")
+
+            with self.__lock:
+                posts = [post for post in self.__posts if post["data"]["name"] in ids]
+
+            return 200, listing_json(posts)
+
+        @self.server.route("GET", r"/r/([^/]+)/comments/(\w+)", "comments")
+        def comments(handler: StandInHandler, match: Match[str], body: bytes):
+            automod = {"kind": "t1", "data": {"author": "AutoModerator", "locked": False,
+                                              "stickied": True,
+                                              "name": f"t1_am{match.group(2)}"}}
+            return 200, [listing_json([]), listing_json([automod])]
+
+        @self.server.route("POST", r"/api/comment", "comment")
+        def comment(handler: StandInHandler, match: Match[str], body: bytes):
+            form = {key: values[-1] for key, values in parse_qs(body.decode()).items()}
+
+            if (post_name := CONTACT_POST_NAME.search(form["text"])) is not None:
+                with self.__lock:
+                    self.comment_times.setdefault(post_name.group(1), time())
+
+            return 200, {"json": {"errors": [], "data": {"things": [
+                {"kind": "t1", "data": {"name": f"t1_c{len(self.comment_times)}"}}
+            ]}}}
+
+        @self.server.route("POST", r"/api/editusertext", "editusertext")
+        def editusertext(handler: StandInHandler, match: Match[str], body: bytes):
+            return 200, {"json": {"errors": [], "data": {"things": []}}}
+
+    def release(self, post: dict[str, Any]):
+        with self.__lock:
+            post["data"]["created_utc"] = time()
+            self.release_times[post["data"]["name"]] = post["data"]["created_utc"]
+            self.__posts.insert(0, post)
+
+
+class SourceStandIn:
+    def __init__(self, file_size: int, latency: float = 0., failure_rate: float = 0.):
+        self.file_size = file_size
+        self.server = StandInServer("source", latency=latency, failure_rate=failure_rate)
+
+        @self.server.route("GET", r"/media/(\w+)\.mp4", "media")
+        def media(handler: StandInHandler, match: Match[str], body: bytes):
+            return 200, media_bytes(match.group(1), self.file_size)
+
+        @self.server.route("GET", r"/status/(\w+)/(\w+)", "status")
+        def status(handler: StandInHandler, match: Match[str], body: bytes):
+            return 200, {"available": True, "processing": False}
+
+
+class UploadStandIn:
+    def __init__(self, host: str, latency: float = 0., failure_rate: float = 0.):
+        self.__lock = Lock()
+        self.__uploads: set[str] = set()
+        self.host = host
+        self.server = StandInServer(host, latency=latency, failure_rate=failure_rate)
+
+        @self.server.route("POST", r"/upload", "upload")
+        def upload(handler: StandInHandler, match: Match[str], body: bytes):
+            video_id = sha256(body).hexdigest()[:12]
+
+            with self.__lock:
+                self.__uploads.add(video_id)
+
+            return 200, {"id": video_id, "bytes": len(body)}
+
+        @self.server.route("GET", r"/videos/(.+)", "video")
+        def video(handler: StandInHandler, match: Match[str], body: bytes):
+            with self.__lock:
+                found = match.group(1).split("/")[-1] in self.__uploads
+
+            return (200, {"available": True}) if found else (404, {"available": False})
+
+
+class StandInReddit:
+    def __init__(self, url: str):
+        self.__url = url
+
+    def __request(self, method: str, path: str, params: dict[str, Any] | None = None,
+                  data: dict[str, Any] | None = None):
+        query = f"?{urlencode({k: v for k, v in (params or {}).items() if v is not None})}"
+        request = Request(f"{self.__url}/{path}{query}", method=method,
+                          data=urlencode(data).encode() if data is not None else None)
+        return request_json(request)
+
+    def comment(self, thing_id: str, text: str | None = None, **_):
+        return self.__request("POST", "api/comment", data={"thing_id": thing_id, "text": text})
+
+    def comments(self, post_id: str, subreddit: str | None = None, limit: int | None = None,
+                 **_):
+        return self.__request("GET", f"r/{subreddit}/comments/{post_id}", {"limit": limit})
+
+    def editusertext(self, thing_id: str, text: str | None = None, **_):
+        return self.__request("POST", "api/editusertext",
+                              data={"thing_id": thing_id, "text": text})
+
+    def info(self, ids: list[str] | None = None, subreddit: str | None = None, **_):
+        return self.__request("GET", "api/info", {"id": ",".join(ids or [])})
+
+    def posts(self, subreddit: str | None = None, before: str | None = None,
+              limit: int | None = None, **_):
+        return self.__request("GET", f"r/{subreddit}/new", {"before": before, "limit": limit})
+
+
+class StandInSourceHost:
+    def __init__(self, source_url: str, host: str):
+        self.__host = host
+        self.__url = source_url
+
+    def __status(self, media_id: str):
+        return request_json(Request(f"{self.__url}/status/{self.__host}/{media_id}")).json()
+
+    def get_media(self, media_id: str):
+        self.__status(media_id)
+        return {"media": [{"url": f"{self.__url}/media/{media_id}.mp4"}]}
+
+    def get_post_info(self, gfyname: str):
+        return {"gfyItem": {"mp4Url": f"{self.__url}/media/{gfyname}.mp4"}}
+
+    def get_upload_status(self, gfyname: str):
+        self.__status(gfyname)
+        return {"task": "complete"}
+
+    def get_video_url(self, video_id: str):
+        return f"{self.__url}/media/{video_id}.mp4"
+
+    def is_video_available(self, video_id: str):
+        return self.__status(video_id)["available"]
+
+    def is_video_processing(self, video_id: str):
+        return self.__status(video_id)["processing"]
+
+
+class StandInUploadHost(StandInSourceHost):
+    def __init__(self, source_url: str, host: str, upload_url: str):
+        super().__init__(source_url, host)
+        self.__host = host
+        self.__upload_url = upload_url
+
+    def __uploaded(self, video_id: str):
+        try:
+            request_json(Request(f"{self.__upload_url}/videos/{video_id}"))
+            return True
+
+        except StandInStatusError as ex:
+            if ex.response.status_code != 404:
+                raise ex
+
+            return False
+
+    def get_video_data(self, video_id: str):
+        video_id = video_id.split("/")[-1]
+
+        if not self.__uploaded(video_id):
+            super().is_video_available(video_id)
+
+        return {"videoLink": f"/v/{video_id}.mp4"}
+
+    def is_video_available(self, video_id: str):
+        return self.__uploaded(video_id) or super().is_video_available(video_id)
+
+    def upload_video(self, video_stream, *_, **__):
+        request = Request(f"{self.__upload_url}/upload", data=video_stream, method="POST",
+                          headers={"Content-Type": "application/octet-stream"})
+        video_id = request_json(request).json()["id"]
+
+        if self.__host == "streamable":
+            return {"status": 1, "url": f"https://streamable.com/{video_id}"}
+
+        if self.__host == "streamff":
+            return f"v/{video_id}", f"https://streamff.com/v/{video_id}"
+
+        return {"shortId": video_id}
+
+
+class StandInVHP:
+    def __init__(self, source_url: str, upload_urls: dict[str, str]):
+        self.__source_url = source_url
+        self.gfycat = StandInSourceHost(source_url, "gfycat")
+        self.imgur = StandInSourceHost(source_url, "imgur")
+        self.streamable = StandInUploadHost(source_url, "streamable", upload_urls["streamable"])
+        self.streamff = StandInUploadHost(source_url, "streamff", upload_urls["streamff"])
+        self.streamja = StandInUploadHost(source_url, "streamja", upload_urls["streamja"])
+
+    def get_media_from_url(self, url: str):
+        return urlopen(f"{self.__source_url}/media/{PurePosixPath(urlparse(url).path).stem}.mp4",
+                       timeout=REQUEST_TIMEOUT)
+
+
+class StandInStatusError(HTTPStatusError):
+    def __init__(self, response: StandInResponse):
+        Exception.__init__(self, f"Stand-in request failed with status {response.status_code}!")
+        self.response = response
+
+
+def listing_json(children: list[dict[str, Any]]):
+    return {"kind": "Listing", "data": {"dist": len(children), "children": children,
+                                        "before": None, "after": None}}
+
+
+def media_bytes(media_id: str, file_size: int):
+    seed = sha256(media_id.encode()).digest()
+    buffer = BytesIO()
+
+    while buffer.tell() < file_size:
+        buffer.write(seed)
+
+    return buffer.getvalue()[:file_size]
+
+
+def post_json(subreddit: str, index: int, host: str, title: str):
+    media_id = f"{host}{index}"
+    url = {
+        "gfycat": f"https://gfycat.com/{media_id}",
+        "imgur": f"https://imgur.com/{media_id}",
+        "streamable": f"https://streamable.com/{media_id}",
+        "streamff": f"https://streamff.com/v/{media_id}",
+        "streamja": f"https://streamja.com/{media_id}",
+    }[host]
+
+    return {"kind": "t3", "data": {"id": f"b{index}", "name": f"t3_b{index}",
+                                   "subreddit": subreddit, "title": title, "url": url,
+                                   "removed_by_category": None, "created_utc": time()}}
+
+
+def read_chunked(stream: BinaryIO):
+    body = BytesIO()
+
+    while (size := int(stream.readline().split(b";")[0], 16)) > 0:
+        body.write(stream.read(size))
+        stream.readline()
+
+    stream.readline()
+    return body.getvalue()
+
+
+def request_json(request: Request):
+    try:
+        with urlopen(request, timeout=REQUEST_TIMEOUT) as res:
+            response = StandInResponse(res.status, dict(res.headers), res.read())
+
+    except HTTPError as ex:
+        response = StandInResponse(ex.code, dict(ex.headers), ex.read())
+        raise StandInStatusError(response)
+
+    return response
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from datetime import datetime, timezone
+from json import dump, loads
+from os import environ
+from pathlib import Path
+from statistics import median
+from subprocess import PIPE, run
+from sys import executable, exit as sys_exit
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+CLIENT_MODULES = ("asyncio", "exdc", "exrc", "exvhp", "httpx")
+PACKAGE_PATH = Path(__file__).resolve().parent.parent
+# Each scenario is measured against a baseline that already pays for the imports it cannot
+# avoid, so loading the Reddit client is not charged for importing exrc itself.
+SCENARIOS: dict[str, tuple[str, tuple[str, ...], str | None]] = {
+    "baseline": ("pass", (), None),
+    "client baseline": ("import exrc\nimport httpx", (), None),
+    "import": ("import exmb._main", CLIENT_MODULES, "baseline"),
+    "auth list": ("from exmb._main import __program_main\n" +
+                  "sys.argv[1:] = ['auth', 'list']\n" +
+                  "__program_main()", CLIENT_MODULES, "baseline"),
+    "mirror-posts clients": ("from argparse import Namespace\n" +
+                             "from pathlib import Path\n" +
+                             "from exmb import _main\n" +
+                             "_main.__config_path__ = Path(sys.argv[1])\n" +
+                             "_main.load_clients(Namespace(alias='startup', user_agent=None, " +
+                             "action='mirror-posts'))", ("asyncio", "exdc", "exvhp"),
+                             "client baseline"),
+}
+
+
+def run_scenario(code: str, forbidden: tuple[str, ...], config_path: Path):
+    script = "\n".join([
+        "import sys",
+        f"sys.path.insert(0, {str(PACKAGE_PATH)!r})",
+        code,
+        f"print(__import__('json').dumps([module for module in {forbidden!r} " +
+        "if module in sys.modules]))",
+    ])
+    started = perf_counter()
+    env = {key: value for key, value in environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    res = run([executable, "-c", script, str(config_path)], stdout=PIPE, check=True,
+              env=env | {"HOME": str(config_path)}, text=True)
+    elapsed = perf_counter() - started
+    loaded: list[str] = loads(res.stdout.splitlines()[-1])
+    return elapsed, loaded
+
+
+def measure_startup(args: Namespace):
+    with TemporaryDirectory() as config_path:
+        with Path(config_path).joinpath("startup.json").open(mode="w") as credential_stream:
+            dump({"reddit": {"access_token": "startup", "expires_in": 3600,
+                             "refresh_token": "startup", "scope": "*", "token_type": "bearer",
+                             "client_id": "startup",
+                             "issued_at": datetime.now(tz=timezone.utc).isoformat()},
+                  "discord": {"bot_token": "startup", "owner_id": "0"}}, credential_stream)
+
+        timings: dict[str, float] = {}
+        imported: dict[str, set[str]] = {}
+
+        for scenario in args.scenarios:
+            code, forbidden, _ = SCENARIOS[scenario]
+            elapsed: list[float] = []
+            imported[scenario] = set()
+
+            for _ in range(args.runs):
+                run_elapsed, loaded = run_scenario(code, forbidden, Path(config_path))
+                elapsed.append(run_elapsed)
+                imported[scenario] |= set(loaded)
+
+            timings[scenario] = median(elapsed)
+
+    report = [f"median startup over {args.runs} runs:"]
+    failed = False
+
+    for scenario in args.scenarios:
+        baseline = SCENARIOS[scenario][2]
+        overhead = (timings[scenario] - timings[baseline] if baseline is not None else 0.) * 1000
+        over_budget = overhead > args.budget_ms
+        failed |= over_budget or len(imported[scenario]) > 0
+        report.append(f"  {scenario}: {timings[scenario] * 1000:.1f}ms " +
+                      f"(+{overhead:.1f}ms{', over budget' if over_budget else ''})")
+
+        if len(imported[scenario]) > 0:
+            report.append(f"    unexpectedly imported: {', '.join(sorted(imported[scenario]))}")
+
+    print("\n".join(report))
+
+    if args.output is not None:
+        args.output.write_text("\n".join(report) + "\n")
+
+    return not failed
+
+
+def parse_bench_args():
+    parser = ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=100.)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("scenarios", nargs="*")
+    args = parser.parse_args()
+
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f"Unknown startup scenario {scenario}!")
+
+    if len(args.scenarios) == 0:
+        args.scenarios = list(SCENARIOS)
+
+    for baseline in {SCENARIOS[scenario][2] for scenario in args.scenarios} - {None}:
+        if baseline not in args.scenarios:
+            args.scenarios.insert(0, baseline)
+
+    return args
+
+
+if __name__ == "__main__":
+    if not measure_startup(parse_bench_args()):
+        sys_exit(1)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from collections import deque
+from enum import Enum
+from threading import Lock
+from time import monotonic
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half-open"
+    OPEN = "open"
+
+
+class CircuitBreaker:
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_ratio: float = .5,
+                 cooldown: float = 300., slow_call: float | None = None):
+        self.__calls: deque[bool] = deque(maxlen=window)
+        self.__cooldown = cooldown
+        self.__failure_ratio = failure_ratio
+        self.__lock = Lock()
+        self.__min_calls = min_calls
+        self.__retry_at = 0.
+        self.__slow_call = slow_call
+        self.state = BreakerState.CLOSED
+
+    def allow(self):
+        with self.__lock:
+            if self.state == BreakerState.CLOSED:
+                return True
+
+            if monotonic() < self.__retry_at:
+                return False
+
+            self.state = BreakerState.HALF_OPEN
+            self.__retry_at = monotonic() + self.__cooldown
+            return True
+
+    def record(self, success: bool, latency: float | None = None):
+        if success and self.__slow_call is not None and latency is not None:
+            success = latency <= self.__slow_call
+
+        with self.__lock:
+            if self.state == BreakerState.HALF_OPEN:
+                if success:
+                    self.__calls.clear()
+                    self.state = BreakerState.CLOSED
+
+                else:
+                    self.__retry_at = monotonic() + self.__cooldown
+                    self.state = BreakerState.OPEN
+
+                return
+
+            self.__calls.append(success)
+            failures = self.__calls.count(False)
+
+            if len(self.__calls) >= self.__min_calls and \
+                    failures / len(self.__calls) >= self.__failure_ratio:
+                self.__calls.clear()
+                self.__retry_at = monotonic() + self.__cooldown
+                self.state = BreakerState.OPEN
+
+
+class CircuitBreakers:
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_ratio: float = .5,
+                 cooldown: float = 300., slow_call: float | None = None):
+        self.__breakers: dict[str, CircuitBreaker] = {}
+        self.__cooldown = cooldown
+        self.__failure_ratio = failure_ratio
+        self.__lock = Lock()
+        self.__min_calls = min_calls
+        self.__slow_call = slow_call
+        self.__window = window
+
+    def __getitem__(self, host: str):
+        with self.__lock:
+            if host not in self.__breakers:
+                self.__breakers[host] = CircuitBreaker(window=self.__window,
+                                                       min_calls=self.__min_calls,
+                                                       failure_ratio=self.__failure_ratio,
+                                                       cooldown=self.__cooldown,
+                                                       slow_call=self.__slow_call)
+
+            return self.__breakers[host]
+
+    def allow(self, host: str):
+        return self[host].allow()
+
+    def record(self, host: str, success: bool, latency: float | None = None):
+        self[host].record(success, latency=latency)
+
+    def states(self):
+        with self.__lock:
+            return {host: breaker.state for host, breaker in self.__breakers.items()}
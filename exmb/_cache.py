@@ -0,0 +1,100 @@
+from __future__ import annotations
+from datetime import timedelta
+from json import dumps, loads
+from pathlib import Path
+from sqlite3 import connect
+from threading import Lock
+from time import time
+from typing import Callable
+
+from ._type import Mirrors
+
+
+class MirrorCache:
+    def __init__(self, path: Path, ttl: float = 7 * 24 * 60 * 60, max_entries: int = 10000,
+                 media_ttl: float = 60 * 60):
+        self.__db = connect(path, check_same_thread=False)
+        self.__lock = Lock()
+        self.__max_entries = max_entries
+        self.__media_ttl = media_ttl
+        self.__ttl = ttl
+
+        with self.__lock, self.__db:
+            self.__db.execute("PRAGMA journal_mode=WAL")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS mirror_cache (key TEXT PRIMARY KEY, " +
+                              "mirrors TEXT NOT NULL, created_at REAL NOT NULL, " +
+                              "used_at REAL NOT NULL)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS media_cache (url TEXT PRIMARY KEY, " +
+                              "video_url TEXT, retry INTEGER NOT NULL, " +
+                              "expires_at REAL NOT NULL)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
+
+    def get(self, key: str):
+        now = time()
+
+        with self.__lock, self.__db:
+            row = self.__db.execute("SELECT mirrors FROM mirror_cache WHERE key = ? AND " +
+                                    "created_at > ?", (key, now - self.__ttl)).fetchone()
+
+            if row is None:
+                return None
+
+            self.__db.execute("UPDATE mirror_cache SET used_at = ? WHERE key = ?", (now, key))
+
+        mirrors: Mirrors = loads(row[0])
+        return mirrors
+
+    def invalidate(self, key: str):
+        with self.__lock, self.__db:
+            self.__db.execute("DELETE FROM mirror_cache WHERE key = ?", (key,))
+
+    def put(self, keys: list[str], mirrors: Mirrors):
+        now = time()
+
+        with self.__lock, self.__db:
+            self.__db.executemany("INSERT OR REPLACE INTO mirror_cache VALUES (?, ?, ?, ?)",
+                                  [(key, dumps(mirrors, separators=(",", ":")), now, now)
+                                   for key in keys])
+            self.__db.execute("DELETE FROM mirror_cache WHERE created_at <= ?",
+                              (now - self.__ttl,))
+            self.__db.execute("DELETE FROM mirror_cache WHERE key NOT IN (SELECT key FROM " +
+                              "mirror_cache ORDER BY used_at DESC LIMIT ?)",
+                              (self.__max_entries,))
+
+    def resolve(self, url: str, resolve: Callable[[], str | timedelta | None]):
+        now = time()
+
+        with self.__lock:
+            row = self.__db.execute("SELECT video_url, retry, expires_at FROM media_cache " +
+                                    "WHERE url = ? AND expires_at > ?", (url, now)).fetchone()
+
+        if row is not None:
+            video_url, retry, expires_at = row
+
+            if retry:
+                return timedelta(seconds=expires_at - now)
+
+            return video_url
+
+        video_url = resolve()
+
+        if isinstance(video_url, timedelta):
+            entry = (url, None, True, now + video_url.total_seconds())
+
+        else:
+            entry = (url, video_url, False, now + self.__media_ttl)
+
+        with self.__lock, self.__db:
+            self.__db.execute("INSERT OR REPLACE INTO media_cache VALUES (?, ?, ?, ?)", entry)
+            self.__db.execute("DELETE FROM media_cache WHERE expires_at <= ?", (now,))
+
+        return video_url
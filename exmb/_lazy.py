@@ -0,0 +1,28 @@
+from __future__ import annotations
+from threading import Lock
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyClient(Generic[T]):
+    def __init__(self, load: Callable[[], T]):
+        self.__client: T | None = None
+        self.__load = load
+        self.__lock = Lock()
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    @property
+    def client(self):
+        if self.__client is None:
+            with self.__lock:
+                if self.__client is None:
+                    self.__client = self.__load()
+
+        return self.__client
+
+    @property
+    def loaded(self):
+        return self.__client is not None
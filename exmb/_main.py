@@ -1,24 +1,54 @@
 from __future__ import annotations
 from argparse import ArgumentParser, Namespace
 from collections import deque
-from datetime import datetime, timedelta, timezone
-from json import dump, load
-from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from csv import DictReader
+from datetime import datetime, timedelta
+from functools import partial
+from json import dump, load, loads
+from pathlib import Path, PurePosixPath
 from queue import Queue
-from time import sleep
-from typing import NotRequired, TypedDict
-
-from exdc.client import Gateway, REST
-# from exdc.exception import GatewayReceiveTimeout
-from exdc.type.gateway import Intent, PresenceActivity, PresenceActivityType, PresenceStatus, \
-    PresenceUpdateData
-from exrc import LinkThing, ListingSort, OAuth2Client, OAuth2RevokedTokenException, OAuth2Token
-from exvhp import GfyCatClient, ImgurClient, StreamableClient, StreamffClient, StreamjaClient, \
-    VHPClient
-from exvhp.type import GfyCatCreatePost
-from httpx import HTTPStatusError
+from threading import Event
+from time import monotonic, sleep, time
+from typing import TYPE_CHECKING, Any, Callable, NotRequired, TypeVar, TypedDict, cast
+from urllib.parse import urlparse
+
+from ._breaker import CircuitBreakers
+from ._cache import MirrorCache
+from ._lazy import LazyClient
+from ._media import MediaFile, MediaReader, SourceMedia, TeeReader
+from ._metrics import metrics
+from ._schedule import MAX_RETRIES, Debouncer, MirrorQueue, PollScheduler, poll, retry_delay
+from ._state import StateStore
+from ._type import CommentJob, MirrorJob, Mirrors, SubredditCursor
+from ._work import Lease, LeaseKeeper, WorkQueue, open_work_queue
+
+if TYPE_CHECKING:
+    from asyncio import Queue as AsyncQueue
+
+    from exdc.client import Gateway, REST
+    from exrc import LinkThing, OAuth2Client, OAuth2Token
+    from exvhp import GfyCatClient, ImgurClient, StreamableClient, StreamffClient, \
+        StreamjaClient, VHPClient
+
+    from ._notify import Notifier
+
+else:
+    # Only subclassed for its keys, which type checkers take from exrc instead.
+    OAuth2Token = TypedDict
 
 __config_path__ = Path.home() / ".config" / "exmb"
+CONTENT_LENGTH_MIRROR_HOSTS = ("streamable",)
+MIRROR_ERROR_RETRY = timedelta(seconds=30)
+T = TypeVar("T")
+POST_MANIFEST_ALIASES = {"flair": "flair_text"}
+POST_MANIFEST_COLUMNS = ("description", "flair_id", "flair_text", "host", "no_md5",
+                         "no_websocket", "nsfw", "path", "poll_interval", "poll_max_interval",
+                         "poll_timeout", "post_on_encoding", "private", "send_replies", "spoiler",
+                         "subreddit", "title", "upload_region")
+POST_MANIFEST_FLAGS = ("no_md5", "nsfw", "post_on_encoding", "private", "send_replies",
+                       "spoiler")
+POST_MANIFEST_NUMBERS = ("poll_interval", "poll_max_interval", "poll_timeout")
 
 
 class Credential(TypedDict):
@@ -31,18 +61,19 @@ class DiscordCredential(TypedDict):
     owner_id: str
 
 
-class Mirrors(TypedDict):
-    streamable: NotRequired[str]
-    streamff: NotRequired[str]
-    streamja: NotRequired[str]
-
-
 class RedditCredential(OAuth2Token):
     client_id: str
     client_secret: NotRequired[str]
     issued_at: str
 
 
+class UploadFailed(Exception):
+    def __init__(self, host: str, upload_data: Any):
+        super().__init__(f"{host} upload failed: {upload_data!r}")
+        self.host = host
+        self.upload_data = upload_data
+
+
 def alias_saved():
     return [path.stem for path in __config_path__.glob("*.json")]
 
@@ -56,6 +87,8 @@ def auth_list():
 
 
 def auth_new(args: Namespace):
+    from exrc import OAuth2Client
+
     assert args.alias not in alias_saved()
 
     reddit = OAuth2Client.code_flow_localserver(args.client_id, args.redirect_uri, args.duration,
@@ -81,6 +114,8 @@ def auth_new(args: Namespace):
 
 
 def auth_revoke(args: Namespace):
+    from exrc import OAuth2Client, OAuth2RevokedTokenException
+
     credential = load_credential(args)
 
     client_id = credential["reddit"]["client_id"]
@@ -101,74 +136,167 @@ def auth_revoke(args: Namespace):
         alias_credential_path.unlink()
 
 
-def check_post_deleted(reddit: OAuth2Client, subreddit: str, post_id: str):
-    res = reddit.info(ids=[post_id], subreddit=subreddit)
+def cached_mirrors(vhp: VHPClient, cache: MirrorCache, key: str, hosts: list[str]):
+    mirrors = cache.get(key)
 
-    if res.json()["data"]["dist"] == 0:
-        raise ValueError(f"Post {post_id} doesn't exist!")
+    if mirrors is None:
+        return Mirrors()
 
-    latest_post: LinkThing = res.json()["data"]["children"][0]
-    post_removal_status = latest_post["data"]["removed_by_category"]
-    return post_removal_status is not None
+    alive = Mirrors(**{host: url for host, url in mirrors.items()
+                       if host in hosts and mirror_available(vhp, host, url)})
+
+    if len(alive) != len([host for host in mirrors if host in hosts]):
+        cache.invalidate(key)
+
+    return alive
+
+
+def close_upload_pools(upload_pools: dict[str, ThreadPoolExecutor]):
+    for upload_pool in upload_pools.values():
+        upload_pool.shutdown(wait=False, cancel_futures=True)
 
 
-def comment_mirrors(reddit: OAuth2Client, to_comment: Queue[tuple[LinkThing, Mirrors]]):
+def comment_mirror(reddit: OAuth2Client, post: LinkThing, mirrors: Mirrors,
+                   parent_id: str | None = None, state: StateStore | None = None):
+    post_name = post["data"]["name"]
+    partial_comment = state.partial_comment(post) if state is not None else None
+
+    if partial_comment is not None:
+        comment_name, partial_mirrors = partial_comment
+
+        if len(mirrors) > 0 and mirrors != partial_mirrors:
+            with metrics.timer("comment", host="reddit"):
+                reddit.editusertext(comment_name, text=mirror_comment_text(post, mirrors))
+
+    elif len(mirrors) > 0:
+        if parent_id is None:
+            parent_id = get_stickied_automod_comment_name(reddit, post) or post_name
+
+        with metrics.timer("comment", host="reddit"):
+            reddit.comment(parent_id, text=mirror_comment_text(post, mirrors))
+
+        metrics.observe("post_to_comment", time() - post["data"]["created_utc"])
+
+    if state is not None:
+        state.commented(post, mirrors)
+
+
+def comment_mirrors(reddit: OAuth2Client, to_comment: Queue[tuple[LinkThing, Mirrors]],
+                    comment_parents: dict[str, str], state: StateStore | None = None):
     while to_comment.qsize() > 0:
         post, mirrors = to_comment.get()
+        parent_id = comment_parents.pop(post["data"]["name"], None)
+        comment_mirror(reddit, post, mirrors, parent_id=parent_id, state=state)
+
+
+def comment_partial_mirror(reddit: OAuth2Client, post: LinkThing, mirrors: Mirrors,
+                           comment_parents: dict[str, str], state: StateStore):
+    partial_comment = state.partial_comment(post)
+
+    if partial_comment is not None:
+        comment_name, _ = partial_comment
+
+        with metrics.timer("comment", host="reddit"):
+            reddit.editusertext(comment_name, text=mirror_comment_text(post, mirrors))
+
+    else:
         post_name = post["data"]["name"]
+        parent_id = comment_parents.get(post_name) or \
+            get_stickied_automod_comment_name(reddit, post) or post_name
 
-        if len(mirrors) == 0:
-            continue
+        with metrics.timer("comment", host="reddit"):
+            res = reddit.comment(parent_id, text=mirror_comment_text(post, mirrors))
+
+        comment_name = res.json()["json"]["data"]["things"][0]["data"]["name"]
+        metrics.observe("post_to_comment", time() - post["data"]["created_utc"])
+
+    state.partially_commented(post, comment_name, mirrors)
+
+
+def dispatch_posts(work_queue: WorkQueue, to_mirror: MirrorQueue,
+                   to_comment: Queue[tuple[LinkThing, Mirrors]], comment_parents: dict[str, str],
+                   state: StateStore):
+    while to_mirror.qsize() > 0:
+        post, retries, try_after = to_mirror.get()
+        post_name = post["data"]["name"]
+        work_queue.put("mirror", post_name,
+                       MirrorJob(post=post, parent_id=comment_parents.pop(post_name, post_name),
+                                 retries=retries),
+                       available_at=try_after.timestamp() if try_after is not None else None)
+        to_mirror.done(post)
+        state.dispatched(post)
 
-        _mirrors: list[str] = []
-        _references: dict[str, str] = {}
+    while to_comment.qsize() > 0:
+        post, mirrors = to_comment.get()
+        post_name = post["data"]["name"]
+        work_queue.put("comment", post_name,
+                       CommentJob(post=post, parent_id=comment_parents.pop(post_name, post_name),
+                                  mirrors=mirrors))
+        state.dispatched(post)
 
-        if "streamable" in mirrors:
-            _mirrors.append("* [Streamable][streamable]")
-            _references["streamable"] = mirrors["streamable"]
 
-        if "streamff" in mirrors:
-            _mirrors.append("* [Streamff][streamff]")
-            _references["streamff"] = mirrors["streamff"]
+def mirror_allowed(breakers: CircuitBreakers | None, host: str):
+    if breakers is None or breakers.allow(host):
+        return True
+
+    metrics.count("upload_skipped", host=host)
+    return False
+
 
-        if "streamja" in mirrors:
-            _mirrors.append("* [Streamja][streamja]")
-            _references["streamja"] = mirrors["streamja"]
+def mirror_available(vhp: VHPClient, host: str, url: str):
+    from httpx import HTTPStatusError
 
-        _references["pyexmb-link"] = "https://github.com/eXhumer/pyeXMB"
-        _references["contact-link"] = "https://www.reddit.com/message/compose?to=" + \
-            "%2Fu%2FContentPuff&subject=Issue%20with%20mirrors%20in%20post%20" + \
-            f"{post_name}"
+    if host == "streamable":
+        return vhp.streamable.is_video_available(url[len("https://streamable.com/"):])
 
-        md_text = "\n\n".join(["**Mirrors**", *_mirrors, "---",
-                               "^Powered ^by ^[pyeXMB][pyexmb-link] ^| [^(Contact " +
-                               "author incase of issue with mirrors)][contact-link]",
-                               "\n".join([f"[{key}]: {val}"
-                                          for key, val in _references.items()])])
+    elif host == "streamff":
+        try:
+            vhp.streamff.get_video_data(url[len("https://streamff.com/"):])
 
-        parent_id = post_name
-        res = reddit.comments(post["data"]["id"], subreddit=post["data"]["subreddit"], limit=1)
+        except HTTPStatusError as ex:
+            if ex.response.status_code == 404:
+                return False
+
+            raise ex
+
+        return True
+
+    elif host == "streamja":
+        return vhp.streamja.is_video_available(url[len("https://streamja.com/"):])
+
+    return False
 
-        if (
-            len(res.json()) == 2
-            and len(res.json()[1]["data"]["children"]) > 0
-        ):
-            comment = res.json()[1]["data"]["children"][0]["data"]
 
-            author = comment["author"] if "author" in comment else None
-            locked = comment["locked"] if "locked" in comment else None
-            stickied = comment["stickied"] if "stickied" in comment else None
+def mirror_comment_text(post: LinkThing, mirrors: Mirrors):
+    post_name = post["data"]["name"]
+    _mirrors: list[str] = []
+    _references: dict[str, str] = {}
 
-            if (author is not None and author == "AutoModerator") and \
-                    (locked is not None and locked is False) and \
-                    (stickied is not None and stickied is True):
-                parent_id = comment["name"]
+    if "streamable" in mirrors:
+        _mirrors.append("* [Streamable][streamable]")
+        _references["streamable"] = mirrors["streamable"]
 
-        reddit.comment(parent_id, text=md_text)
+    if "streamff" in mirrors:
+        _mirrors.append("* [Streamff][streamff]")
+        _references["streamff"] = mirrors["streamff"]
+
+    if "streamja" in mirrors:
+        _mirrors.append("* [Streamja][streamja]")
+        _references["streamja"] = mirrors["streamja"]
+
+    _references["pyexmb-link"] = "https://github.com/eXhumer/pyeXMB"
+    _references["contact-link"] = "https://www.reddit.com/message/compose?to=" + \
+        "%2Fu%2FContentPuff&subject=Issue%20with%20mirrors%20in%20post%20" + \
+        f"{post_name}"
+
+    return "\n\n".join(["**Mirrors**", *_mirrors, "---",
+                        "^Powered ^by ^[pyeXMB][pyexmb-link] ^| [^(Contact " +
+                        "author incase of issue with mirrors)][contact-link]",
+                        "\n".join([f"[{key}]: {val}" for key, val in _references.items()])])
 
 
 def mirror_for_posts(reddit: OAuth2Client, vhp: VHPClient, args: Namespace):
-    to_mirror: Queue[tuple[LinkThing, int, datetime | None]] = Queue()
+    to_mirror = MirrorQueue(retry_budget=timedelta(seconds=args.retry_budget))
     to_comment: Queue[tuple[LinkThing, Mirrors]] = Queue()
 
     mirror_post_names = [f"t3_{post_id}" for post_id in args.post_ids]
@@ -180,26 +308,96 @@ def mirror_for_posts(reddit: OAuth2Client, vhp: VHPClient, args: Namespace):
                                     in res.json()["data"]["children"])]
 
     found_posts: list[LinkThing] = res.json()["data"]["children"]
+    comment_parents = {post_name: automod_comment_name or post_name
+                       for post_name, automod_comment_name
+                       in get_stickied_automod_comment_names(reddit, found_posts, args).items()}
 
     for post in found_posts:
         to_mirror.put((post, 0, None))
 
-    mirror_posts(vhp, to_mirror, to_comment, args)
-    comment_mirrors(reddit, to_comment)
+    with MirrorCache(__config_path__.joinpath("cache.sqlite3"), ttl=args.dedup_ttl,
+                     max_entries=args.dedup_max_entries,
+                     media_ttl=args.media_cache_ttl) as cache:
+        mirror_posts(vhp, to_mirror, to_comment, args, cache=cache,
+                     breakers=load_breakers(args))
+
+    comment_mirrors(reddit, to_comment, comment_parents)
 
     return [post["data"]["name"] for post in found_posts], not_found_post_names
 
 
-def get_subreddit_latest_post_name(reddit: OAuth2Client, args: Namespace):
-    res = reddit.posts(subreddit=args.subreddit, sort=ListingSort.NEW, limit=1)
+def forget_media_upload(host: str, digest: str, args: Namespace):
+    with StateStore(__config_path__.joinpath(f"{args.alias}.sqlite3")) as state:
+        state.forget_upload(digest, host)
+
+
+def get_stickied_automod_comment_name(reddit: OAuth2Client, post: LinkThing):
+    res = reddit.comments(post["data"]["id"], subreddit=post["data"]["subreddit"], limit=1)
+    res_json = res.json()
+
+    if len(res_json) == 2 and len(res_json[1]["data"]["children"]) > 0:
+        comment = res_json[1]["data"]["children"][0]["data"]
+
+        author = comment["author"] if "author" in comment else None
+        locked = comment["locked"] if "locked" in comment else None
+        stickied = comment["stickied"] if "stickied" in comment else None
+
+        if author == "AutoModerator" and locked is False and stickied is True:
+            return comment["name"]
+
+    return None
+
+
+def get_stickied_automod_comment_names(reddit: OAuth2Client, posts: list[LinkThing],
+                                       args: Namespace):
+    with ThreadPoolExecutor(max_workers=args.lookup_workers) as lookup_pool:
+        automod_comment_names = lookup_pool.map(get_stickied_automod_comment_name,
+                                                [reddit] * len(posts), posts)
+
+        return {post["data"]["name"]: automod_comment_name
+                for post, automod_comment_name in zip(posts, automod_comment_names)}
+
+
+def get_subreddit_latest_post_name(reddit: OAuth2Client, subreddit: str):
+    from exrc import ListingSort
+
+    res = reddit.posts(subreddit=subreddit, sort=ListingSort.NEW, limit=1)
 
     if res.json()["data"]["dist"] == 0:
-        raise ValueError(f"No posts in subreddit r/{args.subreddit}!")
+        raise ValueError(f"No posts in subreddit r/{subreddit}!")
 
     latest_post: LinkThing = res.json()["data"]["children"][0]
     return latest_post["data"]["name"]
 
 
+def get_subreddit_posts(reddit: OAuth2Client, cursor: SubredditCursor, args: Namespace):
+    from exrc import ListingSort
+
+    with metrics.timer("search", host="reddit"):
+        return reddit.posts(subreddit=cursor["subreddit"], sort=ListingSort.NEW,
+                            before=cursor["before"], limit=args.limit)
+
+
+def host_upload_timeouts(args: Namespace):
+    upload_timeouts = {host: float(args.upload_timeout) for host in MIRROR_UPLOADERS}
+
+    for host_upload_timeout in args.host_upload_timeout:
+        host, _, upload_timeout = host_upload_timeout.partition("=")
+
+        if host not in MIRROR_UPLOADERS:
+            raise ValueError(f"Unsupported mirror host {host}!")
+
+        upload_timeouts[host] = float(upload_timeout)
+
+    return upload_timeouts
+
+
+def load_breakers(args: Namespace):
+    return CircuitBreakers(window=args.breaker_window, min_calls=args.breaker_min_calls,
+                           failure_ratio=args.breaker_failure_ratio,
+                           cooldown=args.breaker_cooldown, slow_call=args.breaker_slow_call)
+
+
 def load_clients(args: Namespace):
     credential = load_credential(args)
 
@@ -210,24 +408,44 @@ def load_clients(args: Namespace):
     if "client_secret" in credential["reddit"]:
         client_secret = credential["reddit"]["client_secret"]
 
-    reddit = OAuth2Client(client_id, credential["reddit"], token_issued_at=issued_at,
-                          client_secret=client_secret, user_agent=args.user_agent)
+    from ._reddit import RateLimitedClient
+
+    reddit = RateLimitedClient(client_id, credential["reddit"], token_issued_at=issued_at,
+                               client_secret=client_secret, user_agent=args.user_agent)
     discord_clients = None
 
+    def load_vhp():
+        from exvhp import VHPClient
+
+        return VHPClient(user_agent=args.user_agent)
+
     if "discord" in credential and args.action == "run-bot":
-        discord_rest = REST.with_bot_token(credential["discord"]["bot_token"],
-                                           user_agent=args.user_agent)
-        presence_update = PresenceUpdateData(
-            activities=[PresenceActivity(name=f"for media posts on 'r/{args.subreddit}'",
-                                         type=PresenceActivityType.WATCHING)],
-            status=PresenceStatus.DND,
-            afk=True)
-        discord_gateway = Gateway(credential["discord"]["bot_token"], Intent.DIRECT_MESSAGES,
-                                  presence_update=presence_update, user_agent=args.user_agent)
-
-        discord_clients = (discord_rest, discord_gateway)
-
-    return reddit, VHPClient(user_agent=args.user_agent), discord_clients, \
+        bot_token = credential["discord"]["bot_token"]
+
+        def load_discord_rest():
+            from exdc.client import REST
+
+            return REST.with_bot_token(bot_token, user_agent=args.user_agent)
+
+        def load_discord_gateway():
+            from exdc.client import Gateway
+            from exdc.type.gateway import Intent, PresenceActivity, PresenceActivityType, \
+                PresenceStatus, PresenceUpdateData
+
+            presence_update = PresenceUpdateData(
+                activities=[PresenceActivity(name="for media posts on " +
+                                             ", ".join(f"'r/{subreddit}'"
+                                                       for subreddit in args.subreddits),
+                                             type=PresenceActivityType.WATCHING)],
+                status=PresenceStatus.DND,
+                afk=True)
+            return Gateway(bot_token, Intent.DIRECT_MESSAGES, presence_update=presence_update,
+                           user_agent=args.user_agent)
+
+        discord_clients = (cast("REST", LazyClient(load_discord_rest)),
+                           cast("Gateway", LazyClient(load_discord_gateway)))
+
+    return reddit, cast("VHPClient", LazyClient(load_vhp)), discord_clients, \
         credential["discord"]["owner_id"] if "discord" in credential else None
 
 
@@ -242,103 +460,338 @@ def load_credential(args: Namespace):
     return credential
 
 
-def mirror_posts(vhp: VHPClient, to_mirror: Queue[tuple[LinkThing, int, datetime | None]],
-                 to_comment: Queue[tuple[LinkThing, Mirrors]], args: Namespace):
-    while to_mirror.qsize() > 0:
-        post, retries, try_after = to_mirror.get()
+def load_debouncer(reddit: OAuth2Client, comment_parents: dict[str, str], state: StateStore,
+                   args: Namespace):
+    if not args.incremental_comments:
+        return None
 
-        if retries >= 5:
-            continue
+    def comment_partial_mirrors(partial: tuple[LinkThing, Mirrors]):
+        post, mirrors = partial
 
-        if try_after is not None and try_after > datetime.now(tz=timezone.utc):
-            to_mirror.put((post, retries, try_after))
-            continue
+        try:
+            comment_partial_mirror(reddit, post, mirrors, comment_parents, state)
 
-        media_url = post["data"]["url"]
+        except Exception as ex:
+            metrics.count("comment_errors", host="reddit")
+            raise ex
 
-        if media_url.startswith("https://gfycat.com/"):
-            gfyname = media_url[len("https://gfycat.com/"):]
-            upload_status = vhp.gfycat.get_upload_status(gfyname)
+    debouncer: Debouncer[tuple[LinkThing, Mirrors]] = \
+        Debouncer(comment_partial_mirrors, args.comment_edit_interval)
+    return debouncer
 
-            if upload_status["task"] != "complete":
-                if "time" in upload_status:
-                    try_after = datetime.now(tz=timezone.utc) + \
-                        timedelta(seconds=upload_status["time"])
-                    to_mirror.put((post, retries + 1, try_after))
 
-                continue
+def load_metrics(to_mirror_depth: Callable[[], int], to_comment_depth: Callable[[], int],
+                 args: Namespace):
+    metrics.gauge("to_mirror_depth", to_mirror_depth)
+    metrics.gauge("to_comment_depth", to_comment_depth)
+    server = metrics.serve(args.metrics_port) if args.metrics_port is not None else None
+    metrics_dump = metrics.start_dump(args.metrics_dump, args.metrics_dump_interval) \
+        if args.metrics_dump is not None else None
 
-            video_url = vhp.gfycat.get_post_info(gfyname)["gfyItem"]["mp4Url"]
+    def close_metrics():
+        if server is not None:
+            server.shutdown()
+            server.server_close()
 
-        elif media_url.startswith("https://imgur.com/"):
-            if media_url.startswith("https://imgur.com/a/"):
-                continue
+        if metrics_dump is not None:
+            stop, thread = metrics_dump
+            stop.set()
+            thread.join()
 
-            media_id = media_url[len("https://imgur.com/"):]
+    return close_metrics
 
-            try:
-                video_url = vhp.imgur.get_media(media_id)["media"][0]["url"]
 
-            except HTTPStatusError as ex:
-                if ex.response.status_code == 404:
-                    continue
+def load_notifier(discord: tuple[REST, Gateway] | None, discord_owner_id: str | None,
+                  to_mirror_depth: Callable[[], int], to_comment_depth: Callable[[], int],
+                  args: Namespace):
+    if discord is None:
+        return None
 
-                raise ex
+    from ._notify import Notifier
 
-        elif media_url.startswith("https://streamable.com/"):
-            video_id = media_url[len("https://streamable.com/"):]
+    assert discord_owner_id is not None
+    rest, _ = discord
+    owner_dm_channel = rest.create_dm_channel(discord_owner_id)
+    return Notifier(rest, owner_dm_channel["id"], args.notify_interval,
+                    depths={"to mirror": to_mirror_depth, "to comment": to_comment_depth})
 
-            if not vhp.streamable.is_video_available(video_id):
-                continue
 
-            if vhp.streamable.is_video_processing(video_id):
-                try_after = datetime.now(tz=timezone.utc) + timedelta(seconds=10)
-                to_mirror.put((post, retries + 1, try_after))
-                continue
+def load_post_manifest(args: Namespace):
+    with args.manifest.open(mode="r", newline="") as manifest_stream:
+        if args.manifest.suffix == ".csv":
+            rows: list[dict[str, str | bool | None]] = list(DictReader(manifest_stream))
 
-            video_url = vhp.streamable.get_video_url(video_id)
+        else:
+            rows = [loads(line) for line in manifest_stream if line.strip()]
 
-        elif media_url.startswith("https://streamff.com/v/"):
-            video_id = media_url[len("https://streamff.com/"):]
-            video_link = vhp.streamff.get_video_data(video_id)["videoLink"]
-            video_url = f"https://streamff.com{video_link}"
+    entries: list[Namespace] = []
 
-        elif media_url.startswith("https://streamja.com/"):
-            media_url = media_url.replace("/embed/", "/")
-            video_id = media_url[len("https://streamja.com/"):]
+    for row_number, row in enumerate(rows, start=1):
+        entry = Namespace(alias=args.alias, description=None, flair_id=args.flair_id,
+                          flair_text=args.flair_text, no_md5=False, no_resume=args.no_resume,
+                          no_websocket=None, nsfw=args.nsfw,
+                          poll_interval=args.poll_interval,
+                          poll_max_interval=args.poll_max_interval,
+                          poll_timeout=args.poll_timeout, post_on_encoding=False, private=False,
+                          send_replies=args.send_replies, spoiler=args.spoiler,
+                          subreddit=args.subreddit, upload_region=None)
 
-            if not vhp.streamja.is_video_available(video_id):
-                continue
+        for key, value in row.items():
+            key = key.replace("-", "_")
+            key = POST_MANIFEST_ALIASES.get(key, key)
+
+            if key not in POST_MANIFEST_COLUMNS:
+                raise ValueError(f"Unsupported manifest column {key} in row {row_number}!")
 
-            if vhp.streamja.is_video_processing(video_id):
-                try_after = datetime.now(tz=timezone.utc) + timedelta(seconds=10)
-                to_mirror.put((post, retries + 1, try_after))
+            if value is None or value == "":
                 continue
 
-            video_url = vhp.streamja.get_video_url(video_id)
+            if key in POST_MANIFEST_FLAGS and isinstance(value, str):
+                value = value.lower() in ("1", "true", "yes")
+
+            elif key in POST_MANIFEST_NUMBERS:
+                try:
+                    value = float(value)
+
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid manifest {key} {value!r} in row " +
+                                     f"{row_number}!") from None
+
+            setattr(entry, key, value)
+
+        if "path" not in entry or "title" not in entry or "host" not in entry:
+            raise ValueError(f"Manifest row {row_number} is missing path, title or host!")
+
+        entry.media_path = args.manifest.parent.joinpath(entry.path)
+        entry.post_action = entry.host
+        entries.append(entry)
+
+    return entries
+
+
+def load_subreddit_cursors(args: Namespace):
+    assert len(args.subreddits) > 0
+
+    subreddits = ["+".join(args.subreddits)] if args.combined_listing else args.subreddits
+    assert args.before is None or len(subreddits) == 1
+
+    return deque(SubredditCursor(subreddit=subreddit, before=args.before,
+                                 recent=deque(maxlen=args.cursor_window))
+                 for subreddit in subreddits)
+
+
+def load_upload_pools(args: Namespace):
+    return {host: ThreadPoolExecutor(max_workers=args.upload_workers,
+                                     thread_name_prefix=f"upload-{host}")
+            for host in MIRROR_UPLOADERS}
+
+
+def load_work_queue(args: Namespace):
+    return open_work_queue(args.queue or
+                           f"sqlite://{__config_path__.joinpath(f'{args.alias}.queue.sqlite3')}",
+                           max_attempts=args.max_attempts)
+
+
+def mirror_hosts(args: Namespace):
+    return [host for host in MIRROR_UPLOADERS if host != "streamff" or args.streamff_mirror]
+
+
+def mirror_post(vhp: VHPClient, upload_pools: dict[str, ThreadPoolExecutor],
+                cache: MirrorCache | None,
+                post: LinkThing, args: Namespace,
+                debouncer: Debouncer[tuple[LinkThing, Mirrors]] | None = None,
+                breakers: CircuitBreakers | None = None):
+    from ._resolver import resolvers
+
+    media_url = post["data"]["url"]
+    match = resolvers.match(media_url)
+
+    with metrics.timer("resolve", host=match[0] if match is not None else "unknown") as outcome:
+        if cache is not None:
+            video_url = cache.resolve(media_url, partial(resolvers.resolve, vhp, media_url))
 
         else:
-            continue
+            video_url = resolvers.resolve(vhp, media_url)
+
+        outcome["outcome"] = "ready" if isinstance(video_url, str) else \
+            "retry" if isinstance(video_url, timedelta) else "missing"
+
+    if not isinstance(video_url, str):
+        return video_url
+
+    hosts = mirror_hosts(args)
+    mirrors = Mirrors()
+
+    if cache is not None:
+        mirrors |= cached_mirrors(vhp, cache, f"url:{video_url}", hosts)
+
+        if all(host in mirrors for host in hosts):
+            return mirrors
+
+    streamed = [host for host in hosts
+                if host not in mirrors and args.stream_uploads and
+                host not in CONTENT_LENGTH_MIRROR_HOSTS and mirror_allowed(breakers, host)]
+    media_name = PurePosixPath(urlparse(video_url).path).name or "video.mp4"
+    stream_pool = ThreadPoolExecutor(max_workers=max(1, len(streamed)))
+    upload_timeouts = host_upload_timeouts(args)
+
+    started: dict[str, float] = {}
+    submitted: dict[str, float] = {}
+
+    try:
+        with SourceMedia(media_name) as media:
+            uploads: dict[Future[str], str] = {
+                stream_pool.submit(upload_mirror, host, vhp,
+                                   media.tee(args.stream_buffer_chunks,
+                                             timeout=upload_timeouts[host]),
+                                   post, started=started): host
+                for host in streamed
+            }
+            submitted |= {host: monotonic() for host in streamed}
+
+            media.download(vhp.get_media_from_url(video_url))
+
+            if cache is not None:
+                mirrors |= cached_mirrors(vhp, cache, f"sha256:{media.digest}", hosts)
+
+            for host in hosts:
+                if host not in streamed and host not in mirrors and \
+                        mirror_allowed(breakers, host):
+                    uploads[upload_pools[host].submit(upload_mirror, host, vhp, media.reader(),
+                                                      post, started=started)] = host
+                    submitted[host] = monotonic()
+
+            if debouncer is not None and len(mirrors) > 0:
+                debouncer.push(post["data"]["name"], (post, mirrors.copy()))
+
+            pending = set(uploads)
+
+            while len(pending) > 0:
+                timeout = min(started.get(uploads[upload], submitted[uploads[upload]]) +
+                              upload_timeouts[uploads[upload]] for upload in pending) - \
+                    monotonic()
+                done, pending = wait(pending, timeout=max(0., timeout),
+                                     return_when=FIRST_COMPLETED)
+
+                for upload in done:
+                    host = uploads[upload]
+                    succeeded = upload.exception() is None
+
+                    if breakers is not None:
+                        breakers.record(host, succeeded,
+                                        latency=monotonic() - started.get(host, monotonic()))
+
+                    if succeeded:
+                        mirrors |= {host: upload.result()}
 
-        video_stream = vhp.get_media_from_url(video_url)
+                        if debouncer is not None:
+                            debouncer.push(post["data"]["name"], (post, mirrors.copy()))
 
-        mirrors = Mirrors()
+                for upload in list(pending):
+                    host = uploads[upload]
 
-        if True:
-            mirror_streamable = vhp.streamable.clip_video(video_url, title=post["data"]["title"])
-            mirrors |= {"streamable": mirror_streamable["url"]}
+                    if started.get(host, submitted[host]) + upload_timeouts[host] > monotonic():
+                        continue
 
-        if args.streamff_mirror:
-            mirror_streamff_video_id, mirror_streamff_url = \
-                vhp.streamff.upload_video(video_stream)
-            mirrors |= {"streamff": mirror_streamff_url}
+                    # Uploads still queued behind abandoned ones are given up on the same way,
+                    # only those that started count against the host's breaker.
+                    if host not in started and not upload.cancel():
+                        continue
 
-        if True:
-            mirror_streamja = vhp.streamja.upload_video(video_stream)
-            mirror_shortid = mirror_streamja['shortId']
-            mirrors |= {"streamja": f"https://streamja.com/{mirror_shortid}"}
+                    pending.discard(upload)
+                    metrics.count("upload_timeouts", host=host)
 
-        to_comment.put((post, mirrors))
+                    if breakers is not None and host in started:
+                        breakers.record(host, False)
+
+    finally:
+        stream_pool.shutdown(wait=False, cancel_futures=True)
+
+        if debouncer is not None:
+            debouncer.cancel(post["data"]["name"])
+
+    if cache is not None:
+        cache.put([f"url:{video_url}", f"sha256:{media.digest}"], mirrors)
+
+    return mirrors
+
+
+def mirror_posts(vhp: VHPClient, to_mirror: MirrorQueue,
+                 to_comment: Queue[tuple[LinkThing, Mirrors]], args: Namespace,
+                 cache: MirrorCache | None = None, state: StateStore | None = None,
+                 notifier: Notifier | None = None,
+                 debouncer: Debouncer[tuple[LinkThing, Mirrors]] | None = None,
+                 breakers: CircuitBreakers | None = None):
+    mirroring: dict[Future[Mirrors | timedelta | None], tuple[LinkThing, int]] = {}
+    upload_pools = load_upload_pools(args)
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.mirror_workers) as mirror_pool:
+            while to_mirror.qsize() > 0 or len(mirroring) > 0:
+                ready_in = to_mirror.ready_in()
+
+                while ready_in == 0:
+                    post, retries, try_after = to_mirror.get()
+                    mirroring[mirror_pool.submit(mirror_post, vhp, upload_pools, cache, post,
+                                                 args, debouncer=debouncer,
+                                                 breakers=breakers)] = (post, retries)
+                    ready_in = to_mirror.ready_in()
+
+                if len(mirroring) == 0:
+                    sleep(ready_in)
+                    continue
+
+                done, _ = wait(mirroring, timeout=ready_in, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    post, retries = mirroring.pop(future)
+
+                    if future.exception() is not None:
+                        metrics.count("mirror_errors", host=urlparse(post["data"]["url"]).netloc)
+                        mirrors = settle_mirror(to_mirror, post, retries, MIRROR_ERROR_RETRY,
+                                                state=state, notifier=notifier)
+
+                    else:
+                        mirrors = settle_mirror(to_mirror, post, retries, future.result(),
+                                                state=state, notifier=notifier)
+
+                    if mirrors is not None:
+                        to_comment.put((post, mirrors))
+
+    finally:
+        close_upload_pools(upload_pools)
+
+
+def mirror_streamable(vhp: VHPClient, video_stream: MediaReader | TeeReader, post: LinkThing):
+    with video_stream:
+        upload_data = vhp.streamable.upload_video(video_stream, filename=video_stream.name,
+                                                  title=post["data"]["title"])
+
+    if upload_data["status"] != 1:
+        raise UploadFailed("streamable", upload_data)
+
+    return upload_data["url"]
+
+
+def mirror_streamff(vhp: VHPClient, video_stream: MediaReader | TeeReader, post: LinkThing):
+    with video_stream:
+        mirror_streamff_video_id, mirror_streamff_url = vhp.streamff.upload_video(video_stream)
+
+    return mirror_streamff_url
+
+
+def mirror_streamja(vhp: VHPClient, video_stream: MediaReader | TeeReader, post: LinkThing):
+    with video_stream:
+        mirror_shortid = vhp.streamja.upload_video(video_stream)["shortId"]
+
+    return f"https://streamja.com/{mirror_shortid}"
+
+
+MIRROR_UPLOADERS = {
+    "streamable": mirror_streamable,
+    "streamff": mirror_streamff,
+    "streamja": mirror_streamja,
+}
 
 
 def parse_program_args():
@@ -367,6 +820,22 @@ def parse_program_args():
     mirror_posts_parser.add_argument("--reddit-mirror", action="store_true")
     mirror_posts_parser.add_argument("--streamff-mirror", action="store_true")
     mirror_posts_parser.add_argument("--skip-missing-stickied-automod", action="store_true")
+    mirror_posts_parser.add_argument("--mirror-workers", type=int, default=4)
+    mirror_posts_parser.add_argument("--upload-workers", type=int, default=3)
+    mirror_posts_parser.add_argument("--retry-budget", type=int, default=900)
+    mirror_posts_parser.add_argument("--stream-uploads", action="store_true")
+    mirror_posts_parser.add_argument("--stream-buffer-chunks", type=int, default=64)
+    mirror_posts_parser.add_argument("--lookup-workers", type=int, default=4)
+    mirror_posts_parser.add_argument("--dedup-ttl", type=int, default=7 * 24 * 60 * 60)
+    mirror_posts_parser.add_argument("--dedup-max-entries", type=int, default=10000)
+    mirror_posts_parser.add_argument("--media-cache-ttl", type=int, default=60 * 60)
+    mirror_posts_parser.add_argument("--upload-timeout", type=int, default=300)
+    mirror_posts_parser.add_argument("--host-upload-timeout", action="append", default=[])
+    mirror_posts_parser.add_argument("--breaker-window", type=int, default=20)
+    mirror_posts_parser.add_argument("--breaker-min-calls", type=int, default=5)
+    mirror_posts_parser.add_argument("--breaker-failure-ratio", type=float, default=.5)
+    mirror_posts_parser.add_argument("--breaker-cooldown", type=int, default=300)
+    mirror_posts_parser.add_argument("--breaker-slow-call", type=float)
     post_parser = subparsers.add_parser("post")
     post_parser.add_argument("alias")
     post_parser.add_argument("title")
@@ -377,6 +846,10 @@ def parse_program_args():
     post_parser.add_argument("--subreddit")
     post_parser.add_argument("--flair-id")
     post_parser.add_argument("--flair-text")
+    post_parser.add_argument("--poll-interval", type=float, default=1.)
+    post_parser.add_argument("--poll-max-interval", type=float, default=30.)
+    post_parser.add_argument("--poll-timeout", type=float, default=900.)
+    post_parser.add_argument("--no-resume", action="store_true")
     post_subparsers = post_parser.add_subparsers(dest="post_action")
     post_gfycat_parser = post_subparsers.add_parser("gfycat")
     post_gfycat_parser.add_argument("--description")
@@ -391,45 +864,123 @@ def parse_program_args():
     post_streamable_parser.add_argument("--upload-region")
     post_subparsers.add_parser("streamff")
     post_subparsers.add_parser("streamja")
+    post_batch_parser = subparsers.add_parser("post-batch")
+    post_batch_parser.add_argument("alias")
+    post_batch_parser.add_argument("manifest", type=Path)
+    post_batch_parser.add_argument("--nsfw", action="store_true")
+    post_batch_parser.add_argument("--send-replies", action="store_true")
+    post_batch_parser.add_argument("--spoiler", action="store_true")
+    post_batch_parser.add_argument("--subreddit")
+    post_batch_parser.add_argument("--flair-id")
+    post_batch_parser.add_argument("--flair-text")
+    post_batch_parser.add_argument("--poll-interval", type=float, default=1.)
+    post_batch_parser.add_argument("--poll-max-interval", type=float, default=30.)
+    post_batch_parser.add_argument("--poll-timeout", type=float, default=900.)
+    post_batch_parser.add_argument("--no-resume", action="store_true")
+    post_batch_parser.add_argument("--workers", type=int, default=4)
     run_bot_parser = subparsers.add_parser("run-bot")
     run_bot_parser.add_argument("alias")
-    run_bot_parser.add_argument("subreddit")
+    run_bot_parser.add_argument("subreddits", nargs="*")
+    run_bot_parser.add_argument("--async", action="store_true", dest="async_mode")
+    run_bot_parser.add_argument("--role", choices=["all", "poller", "mirror", "commenter"],
+                                default="all")
+    run_bot_parser.add_argument("--queue")
+    run_bot_parser.add_argument("--visibility-timeout", type=int, default=15 * 60)
+    run_bot_parser.add_argument("--max-attempts", type=int, default=5)
+    run_bot_parser.add_argument("--queue-poll-interval", type=float, default=1.)
     run_bot_parser.add_argument("--before")
+    run_bot_parser.add_argument("--combined-listing", action="store_true")
     run_bot_parser.add_argument("--limit", type=int)
     run_bot_parser.add_argument("--reddit-mirror", action="store_true")
     run_bot_parser.add_argument("--sleep-interval", type=int, default=30)
+    run_bot_parser.add_argument("--min-sleep-interval", type=int, default=5)
+    run_bot_parser.add_argument("--max-sleep-interval", type=int, default=300)
+    run_bot_parser.add_argument("--cursor-window", type=int, default=25)
+    run_bot_parser.add_argument("--max-pages", type=int, default=10)
+    run_bot_parser.add_argument("--max-backlog", type=int, default=500)
     run_bot_parser.add_argument("--streamff-mirror", action="store_true")
     run_bot_parser.add_argument("--skip-missing-stickied-automod", action="store_true")
+    run_bot_parser.add_argument("--mirror-workers", type=int, default=4)
+    run_bot_parser.add_argument("--upload-workers", type=int, default=3)
+    run_bot_parser.add_argument("--retry-budget", type=int, default=900)
+    run_bot_parser.add_argument("--stream-uploads", action="store_true")
+    run_bot_parser.add_argument("--stream-buffer-chunks", type=int, default=64)
+    run_bot_parser.add_argument("--lookup-workers", type=int, default=4)
+    run_bot_parser.add_argument("--dedup-ttl", type=int, default=7 * 24 * 60 * 60)
+    run_bot_parser.add_argument("--dedup-max-entries", type=int, default=10000)
+    run_bot_parser.add_argument("--media-cache-ttl", type=int, default=60 * 60)
+    run_bot_parser.add_argument("--upload-timeout", type=int, default=300)
+    run_bot_parser.add_argument("--host-upload-timeout", action="append", default=[])
+    run_bot_parser.add_argument("--breaker-window", type=int, default=20)
+    run_bot_parser.add_argument("--breaker-min-calls", type=int, default=5)
+    run_bot_parser.add_argument("--breaker-failure-ratio", type=float, default=.5)
+    run_bot_parser.add_argument("--breaker-cooldown", type=int, default=300)
+    run_bot_parser.add_argument("--breaker-slow-call", type=float)
+    run_bot_parser.add_argument("--notify-interval", type=int, default=5 * 60)
+    run_bot_parser.add_argument("--incremental-comments", action="store_true")
+    run_bot_parser.add_argument("--comment-edit-interval", type=int, default=15)
+    run_bot_parser.add_argument("--metrics-port", type=int)
+    run_bot_parser.add_argument("--metrics-dump", type=Path)
+    run_bot_parser.add_argument("--metrics-dump-interval", type=int, default=60)
 
     return parser.parse_args()
 
 
+def post_batch(reddit: OAuth2Client, vhp: VHPClient, args: Namespace):
+    entries = load_post_manifest(args)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as post_pool:
+        submissions = [(row_number, entry, post_pool.submit(post_media, reddit, vhp, entry))
+                       for row_number, entry in enumerate(entries, start=1)]
+
+        posted: list[str] = []
+        failed: dict[str, str] = {}
+
+        for row_number, entry, submission in submissions:
+            row = f"row {row_number} ({entry.media_path} to {entry.host})"
+
+            if submission.exception() is not None:
+                failed[row] = repr(submission.exception())
+                continue
+
+            posted.append(row)
+
+    return posted, failed
+
+
 def post_gfycat(reddit: OAuth2Client, gfycat: GfyCatClient, args: Namespace):
+    from exvhp.type import GfyCatCreatePost
+
     post_data = GfyCatCreatePost(title=args.title, nsfw=args.nsfw, noMd5=args.no_md5,
                                  private=args.private)
 
     if "description" in args:
         post_data |= {"description": args.description}
 
-    gfycat_post = gfycat.new_video_post(post_data=post_data)
-
-    with args.media_path.open(mode="rb") as media_stream:
+    def upload_video(media_stream: MediaReader):
+        gfycat_post = gfycat.new_video_post(post_data=post_data)
         assert gfycat.upload_video(gfycat_post["gfyname"], media_stream,
                                    filename=args.media_path.name,
                                    upload_type=gfycat_post["uploadType"])
+        return gfycat_post
 
-    while True:
+    digest, gfycat_post = upload_media_file("gfycat", upload_video, args)
+
+    def upload_status():
         status = gfycat.get_upload_status(gfycat_post["gfyname"])
 
         if status["task"] == "complete" or \
                 (args.post_on_encoding and status["task"] == "encoding"):
-            break
+            return status
 
         if "time" in status:
-            sleep(status["time"])
+            return timedelta(seconds=status["time"])
 
-        else:
-            raise ValueError(status)
+        raise ValueError(status)
+
+    status, polls = poll(upload_status, interval=args.poll_interval,
+                         max_interval=args.poll_max_interval, timeout=args.poll_timeout)
+    print(f"Upload status polled {polls} times")
 
     gfyname = status["gfyname"] if "gfyname" in status else gfycat_post["gfyname"]
     url = f"https://gfycat.com/{gfyname}"
@@ -437,18 +988,27 @@ def post_gfycat(reddit: OAuth2Client, gfycat: GfyCatClient, args: Namespace):
                                     send_replies=args.send_replies, spoiler=args.spoiler,
                                     subreddit=args.subreddit, flair_id=args.flair_id,
                                     flair_text=args.flair_text)
+    forget_media_upload("gfycat", digest, args)
     print(submission)
+    return submission
 
 
 def post_imgur(reddit: OAuth2Client, imgur: ImgurClient, args: Namespace):
-    with args.media_path.open(mode="rb") as media_stream:
-        ticket = imgur.upload_media(media_stream, args.media_path.name)
+    digest, ticket = upload_media_file("imgur", lambda media_stream:
+                                       imgur.upload_media(media_stream, args.media_path.name),
+                                       args)
 
-    while True:
+    def ticket_status():
         ticket_poll = imgur.poll_video_tickets(ticket["data"]["ticket"])
 
         if ticket["data"]["ticket"] in ticket_poll["data"]["done"]:
-            break
+            return ticket_poll
+
+        return None
+
+    ticket_poll, polls = poll(ticket_status, interval=args.poll_interval,
+                              max_interval=args.poll_max_interval, timeout=args.poll_timeout)
+    print(f"Video ticket polled {polls} times")
 
     media_id = ticket_poll["data"]["done"][ticket["data"]["ticket"]]
     media_data = ticket_poll["data"]["images"][media_id]
@@ -461,11 +1021,35 @@ def post_imgur(reddit: OAuth2Client, imgur: ImgurClient, args: Namespace):
                                     send_replies=args.send_replies,
                                     spoiler=args.spoiler, subreddit=args.subreddit,
                                     flair_id=args.flair_id, flair_text=args.flair_text)
+    forget_media_upload("imgur", digest, args)
     print(submission)
+    return submission
+
+
+def post_media(reddit: OAuth2Client, vhp: VHPClient, args: Namespace):
+    if args.post_action == "gfycat":
+        return post_gfycat(reddit, vhp.gfycat, args)
+
+    elif args.post_action == "imgur":
+        return post_imgur(reddit, vhp.imgur, args)
+
+    elif args.post_action == "reddit":
+        return post_reddit(reddit, args)
+
+    elif args.post_action == "streamable":
+        return post_streamable(reddit, vhp.streamable, args)
+
+    elif args.post_action == "streamff":
+        return post_streamff(reddit, vhp.streamff, args)
+
+    elif args.post_action == "streamja":
+        return post_streamja(reddit, vhp.streamja, args)
+
+    raise ValueError(f"Unsupported post host {args.post_action}!")
 
 
 def post_reddit(reddit: OAuth2Client, args: Namespace):
-    with args.media_path.open(mode="rb") as media_stream:
+    with MediaFile(args.media_path) as media, media.reader() as media_stream:
         submission, update = reddit.submit_video(args.title, media_stream, args.media_path.name,
                                                  nsfw=args.nsfw, send_replies=args.send_replies,
                                                  spoiler=args.spoiler, subreddit=args.subreddit,
@@ -473,40 +1057,55 @@ def post_reddit(reddit: OAuth2Client, args: Namespace):
                                                  flair_text=args.flair_text,
                                                  wait_for_ws_update=not args.no_websocket)
         print(submission, update)
+        return submission
 
 
 def post_streamable(reddit: OAuth2Client, streamable: StreamableClient, args: Namespace):
-    with args.media_path.open(mode="rb") as media_stream:
+    def upload_video(media_stream: MediaReader):
         upload_data = streamable.upload_video(media_stream, filename=args.media_path.name,
                                               title=args.title, upload_region=args.upload_region)
 
-    if upload_data["status"] != 1:
-        raise Exception  # TODO: Better exception raising
+        if upload_data["status"] != 1:
+            raise UploadFailed("streamable", upload_data)
+
+        return upload_data
+
+    digest, upload_data = upload_media_file("streamable", upload_video, args)
 
     submission = reddit.submit_link(args.title, upload_data["url"], nsfw=args.nsfw,
                                     send_replies=args.send_replies,
                                     spoiler=args.spoiler, subreddit=args.subreddit,
                                     flair_id=args.flair_id, flair_text=args.flair_text)
+    forget_media_upload("streamable", digest, args)
     print(submission)
+    return submission
 
 
 def post_streamff(reddit: OAuth2Client, streamff: StreamffClient, args: Namespace):
-    with args.media_path.open(mode="rb") as media_stream:
-        video_id, video_url = streamff.upload_video(media_stream, filename=args.media_path.name)
+    def upload_video(media_stream: MediaReader):
+        return streamff.upload_video(media_stream, filename=args.media_path.name)
+
+    digest, (_, video_url) = upload_media_file("streamff", upload_video, args)
 
     submission = reddit.submit_link(args.title, video_url, nsfw=args.nsfw,
                                     send_replies=args.send_replies,
                                     spoiler=args.spoiler, subreddit=args.subreddit,
                                     flair_id=args.flair_id, flair_text=args.flair_text)
+    forget_media_upload("streamff", digest, args)
     print(submission)
+    return submission
 
 
 def post_streamja(reddit: OAuth2Client, streamja: StreamjaClient, args: Namespace):
-    with args.media_path.open(mode="rb") as media_stream:
+    def upload_video(media_stream: MediaReader):
         upload_data = streamja.upload_video(media_stream, args.media_path.name)
 
-    if upload_data["status"] != 1:
-        raise Exception  # TODO: Better exception raising
+        if upload_data["status"] != 1:
+            raise UploadFailed("streamja", upload_data)
+
+        return upload_data
+
+    digest, upload_data = upload_media_file("streamja", upload_video, args)
 
     url = f"https://streamja.com/{upload_data['shortId']}"
 
@@ -514,104 +1113,517 @@ def post_streamja(reddit: OAuth2Client, streamja: StreamjaClient, args: Namespac
                                     send_replies=args.send_replies,
                                     spoiler=args.spoiler, subreddit=args.subreddit,
                                     flair_id=args.flair_id, flair_text=args.flair_text)
+    forget_media_upload("streamja", digest, args)
     print(submission)
+    return submission
+
+
+def queue_posts(reddit: OAuth2Client, cursor: SubredditCursor, children: list[LinkThing],
+                to_mirror: MirrorQueue, comment_parents: dict[str, str], state: StateStore,
+                args: Namespace):
+    from ._resolver import resolvers
+
+    recent = cursor["recent"]
+    posts = [post for post in children if post["data"]["name"] not in recent]
+
+    if len(posts) == 0:
+        return 0
+
+    candidates = [post for post in reversed(posts)
+                  if resolvers.match(post["data"]["url"]) is not None
+                  and not state.known(post["data"]["name"])]
+    automod_comment_names = get_stickied_automod_comment_names(reddit, candidates, args)
+    queued: list[tuple[LinkThing, str]] = []
+
+    for post in candidates:
+        post_name = post["data"]["name"]
+        automod_comment_name = automod_comment_names[post_name]
+
+        if automod_comment_name is None and args.skip_missing_stickied_automod:
+            continue
+
+        queued.append((post, automod_comment_name or post_name))
+
+    cursor["before"] = posts[0]["data"]["name"]
+    recent.extend(post["data"]["name"] for post in reversed(posts))
+    state.queue_mirrors(cursor, queued)
+
+    for post, parent_id in queued:
+        comment_parents[post["data"]["name"]] = parent_id
+        to_mirror.put((post, 0, None))
+
+    metrics.count("posts_found", len(queued), subreddit=cursor["subreddit"])
+    return len(posts)
+
+
+def restore_bot_state(state: StateStore, cursors: deque[SubredditCursor], to_mirror: MirrorQueue,
+                      to_comment: Queue[tuple[LinkThing, Mirrors]] |
+                      AsyncQueue[tuple[LinkThing, Mirrors]],
+                      comment_parents: dict[str, str], args: Namespace):
+    for cursor in cursors:
+        if cursor["before"] is None:
+            cursor["before"], recent = state.cursor(cursor["subreddit"])
+            cursor["recent"].extend(recent)
+
+    for post, parent_id, retries, try_after, queued_at in state.pending_mirrors():
+        comment_parents[post["data"]["name"]] = parent_id
+        to_mirror.restore(post, retries, try_after, queued_at)
+
+    for post, parent_id, mirrors in state.pending_comments():
+        comment_parents[post["data"]["name"]] = parent_id
+        to_comment.put_nowait((post, mirrors))
 
 
 def run_bot(reddit: OAuth2Client, vhp: VHPClient, args: Namespace,
-            discord: tuple[REST, Gateway] | None = None, discord_owner_id: str | None = None):
-    if discord is not None:
-        assert discord_owner_id is not None
-        rest, gateway = discord
-        owner_dm_channel = rest.create_dm_channel(discord_owner_id)
+            discord: tuple[REST, Gateway] | None = None, discord_owner_id: str | None = None,
+            stop: Event | None = None):
+    stop = stop or Event()
+    comment_parents: dict[str, str] = {}
+    cursors = load_subreddit_cursors(args)
+    polls = PollScheduler(args.sleep_interval, args.min_sleep_interval, args.max_sleep_interval)
+    cache = MirrorCache(__config_path__.joinpath("cache.sqlite3"), ttl=args.dedup_ttl,
+                        max_entries=args.dedup_max_entries, media_ttl=args.media_cache_ttl)
+    state = StateStore(__config_path__.joinpath(f"{args.alias}.sqlite3"))
+    to_comment: Queue[tuple[LinkThing, Mirrors]] = Queue()
+    to_mirror = MirrorQueue(retry_budget=timedelta(seconds=args.retry_budget))
+    notifier = load_notifier(discord, discord_owner_id, to_mirror.qsize, to_comment.qsize, args)
+    close_metrics = load_metrics(to_mirror.qsize, to_comment.qsize, args)
+    debouncer = load_debouncer(reddit, comment_parents, state, args)
+    breakers = load_breakers(args)
 
-    else:
-        rest, gateway, owner_dm_channel = None, None, None
+    restore_bot_state(state, cursors, to_mirror, to_comment, comment_parents, args)
+
+    try:
+        while not stop.is_set():
+            new_posts_len = to_mirror.qsize()
+
+            if search_subreddits(reddit, cursors, polls, to_mirror, comment_parents, state,
+                                 args) or to_mirror.qsize() > 0 or to_comment.qsize() > 0:
+                if notifier is not None:
+                    notifier.count("found", to_mirror.qsize() - new_posts_len)
+
+                mirror_posts(vhp, to_mirror, to_comment, args, cache=cache, state=state,
+                             notifier=notifier, debouncer=debouncer, breakers=breakers)
+
+                if notifier is not None:
+                    notifier.count("commented", to_comment.qsize())
+
+                comment_mirrors(reddit, to_comment, comment_parents, state=state)
+
+            stop.wait(polls.wait_time())
+
+    except KeyboardInterrupt:
+        if notifier is not None:
+            notifier.message("Shutting bot down!")
+
+        comment_mirrors(reddit, to_comment, comment_parents, state=state)
+
+    finally:
+        if notifier is not None:
+            notifier.close()
+
+        close_metrics()
+        cache.close()
+        state.close()
+
+
+async def run_bot_async(reddit: OAuth2Client, vhp: VHPClient, args: Namespace,
+                        discord: tuple[REST, Gateway] | None = None,
+                        discord_owner_id: str | None = None):
+    from asyncio import Event as AsyncEvent, Queue as AsyncQueue, TaskGroup, get_running_loop, \
+        sleep as async_sleep, wait_for
+
+    loop = get_running_loop()
+    comment_parents: dict[str, str] = {}
+    cursors = load_subreddit_cursors(args)
+    polls = PollScheduler(args.sleep_interval, args.min_sleep_interval, args.max_sleep_interval)
+    new_posts = AsyncEvent()
+    cache = MirrorCache(__config_path__.joinpath("cache.sqlite3"), ttl=args.dedup_ttl,
+                        max_entries=args.dedup_max_entries, media_ttl=args.media_cache_ttl)
+    state = StateStore(__config_path__.joinpath(f"{args.alias}.sqlite3"))
+    to_comment: AsyncQueue[tuple[LinkThing, Mirrors]] = AsyncQueue()
+    to_mirror = MirrorQueue(retry_budget=timedelta(seconds=args.retry_budget))
+    notifier = await loop.run_in_executor(None, load_notifier, discord, discord_owner_id,
+                                          to_mirror.qsize, to_comment.qsize, args)
+    close_metrics = load_metrics(to_mirror.qsize, to_comment.qsize, args)
+    debouncer = load_debouncer(reddit, comment_parents, state, args)
+    breakers = load_breakers(args)
+
+    restore_bot_state(state, cursors, to_mirror, to_comment, comment_parents, args)
+
+    async def comment_posts():
+        while True:
+            post, mirrors = await to_comment.get()
+            parent_id = comment_parents.pop(post["data"]["name"], None)
+            await loop.run_in_executor(None, partial(comment_mirror, reddit, post, mirrors,
+                                                     parent_id=parent_id, state=state))
+
+            if notifier is not None:
+                notifier.count("commented")
+
+    async def mirror_ready_posts(mirror_pool: ThreadPoolExecutor,
+                                 upload_pools: dict[str, ThreadPoolExecutor]):
+        while True:
+            ready_in = to_mirror.ready_in()
+
+            if ready_in != 0:
+                new_posts.clear()
+
+                try:
+                    await wait_for(new_posts.wait(), timeout=ready_in)
+
+                except TimeoutError:
+                    pass
+
+                continue
+
+            post, retries, try_after = to_mirror.get()
+
+            try:
+                mirrors = await loop.run_in_executor(mirror_pool,
+                                                     partial(mirror_post, vhp, upload_pools,
+                                                             cache, post, args,
+                                                             debouncer=debouncer,
+                                                             breakers=breakers))
+
+            except Exception:
+                metrics.count("mirror_errors", host=urlparse(post["data"]["url"]).netloc)
+                mirrors = MIRROR_ERROR_RETRY
+
+            mirrors = settle_mirror(to_mirror, post, retries, mirrors, state=state,
+                                    notifier=notifier)
+
+            if mirrors is None:
+                new_posts.set()
+                continue
+
+            await to_comment.put((post, mirrors))
+
+    async def poll_posts():
+        on_queued = partial(loop.call_soon_threadsafe, new_posts.set)
+
+        while True:
+            new_posts_len = to_mirror.qsize()
+
+            if await loop.run_in_executor(None, partial(search_subreddits, reddit, cursors,
+                                                        polls, to_mirror, comment_parents, state,
+                                                        args, on_queued=on_queued)):
+                new_posts.set()
+
+                if notifier is not None:
+                    notifier.count("found", to_mirror.qsize() - new_posts_len)
+
+            await async_sleep(polls.wait_time())
+
+    upload_pools = load_upload_pools(args)
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.mirror_workers) as mirror_pool:
+            async with TaskGroup() as tasks:
+                tasks.create_task(poll_posts())
+                tasks.create_task(comment_posts())
+
+                for _ in range(args.mirror_workers):
+                    tasks.create_task(mirror_ready_posts(mirror_pool, upload_pools))
+
+    finally:
+        close_upload_pools(upload_pools)
+
+        if notifier is not None:
+            notifier.message("Shutting bot down!")
+
+        while not to_comment.empty():
+            post, mirrors = to_comment.get_nowait()
+            parent_id = comment_parents.pop(post["data"]["name"], None)
+            comment_mirror(reddit, post, mirrors, parent_id=parent_id, state=state)
+
+        if notifier is not None:
+            notifier.close()
+
+        close_metrics()
+        cache.close()
+        state.close()
+
+
+def run_commenter(reddit: OAuth2Client, work_queue: WorkQueue, keeper: LeaseKeeper,
+                  args: Namespace, notifier: Notifier | None = None):
+    state = StateStore(__config_path__.joinpath(f"{args.alias}.sqlite3"))
+
+    try:
+        while True:
+            lease = work_queue.lease("comment", args.visibility_timeout)
+
+            if lease is None:
+                sleep(args.queue_poll_interval)
+                continue
+
+            job: CommentJob = lease["payload"]
+            keeper.keep(lease)
+
+            if not state.was_commented(lease["key"]):
+                comment_mirror(reddit, job["post"], job["mirrors"], parent_id=job["parent_id"],
+                               state=state)
 
-    mirror_stack: deque[str] = deque()
+                if notifier is not None:
+                    notifier.count("commented")
+
+            keeper.drop(lease)
+            work_queue.ack(lease)
+
+    finally:
+        state.close()
+
+
+def run_mirror_worker(vhp: VHPClient, work_queue: WorkQueue, keeper: LeaseKeeper,
+                      args: Namespace, notifier: Notifier | None = None):
+    cache = MirrorCache(__config_path__.joinpath("cache.sqlite3"), ttl=args.dedup_ttl,
+                        max_entries=args.dedup_max_entries, media_ttl=args.media_cache_ttl)
+    breakers = load_breakers(args)
+    mirror_pool = ThreadPoolExecutor(max_workers=args.mirror_workers)
+    upload_pools = load_upload_pools(args)
+    mirroring: dict[Future[Mirrors | timedelta | None], Lease] = {}
+
+    try:
+        while True:
+            while len(mirroring) < args.mirror_workers:
+                lease = work_queue.lease("mirror", args.visibility_timeout)
+
+                if lease is None:
+                    break
+
+                job: MirrorJob = lease["payload"]
+                keeper.keep(lease)
+                mirroring[mirror_pool.submit(mirror_post, vhp, upload_pools, cache, job["post"],
+                                             args, breakers=breakers)] = lease
+
+            if len(mirroring) == 0:
+                sleep(args.queue_poll_interval)
+                continue
+
+            done, _ = wait(mirroring, timeout=args.queue_poll_interval,
+                           return_when=FIRST_COMPLETED)
+
+            for future in done:
+                lease = mirroring.pop(future)
+                keeper.drop(lease)
+
+                if future.exception() is not None:
+                    metrics.count("mirror_errors",
+                                  host=urlparse(lease["payload"]["post"]["data"]["url"]).netloc)
+                    settle_mirror_job(work_queue, lease, MIRROR_ERROR_RETRY, args,
+                                      notifier=notifier)
+                    continue
+
+                settle_mirror_job(work_queue, lease, future.result(), args, notifier=notifier)
+
+    finally:
+        mirror_pool.shutdown(wait=False, cancel_futures=True)
+
+        try:
+            for future, lease in mirroring.items():
+                if not future.cancelled() and future.exception() is None:
+                    settle_mirror_job(work_queue, lease, future.result(), args,
+                                      notifier=notifier)
+
+        finally:
+            for future, lease in mirroring.items():
+                if not future.cancelled():
+                    keeper.drop(lease)
+
+            close_upload_pools(upload_pools)
+            cache.close()
+
+
+def run_poller(reddit: OAuth2Client, work_queue: WorkQueue, args: Namespace,
+               notifier: Notifier | None = None):
+    comment_parents: dict[str, str] = {}
+    cursors = load_subreddit_cursors(args)
+    polls = PollScheduler(args.sleep_interval, args.min_sleep_interval, args.max_sleep_interval)
+    state = StateStore(__config_path__.joinpath(f"{args.alias}.sqlite3"))
     to_comment: Queue[tuple[LinkThing, Mirrors]] = Queue()
-    to_mirror: Queue[tuple[LinkThing, int, datetime | None]] = Queue()
+    to_mirror = MirrorQueue(retry_budget=timedelta(seconds=args.retry_budget))
+
+    restore_bot_state(state, cursors, to_mirror, to_comment, comment_parents, args)
 
     try:
         while True:
-            if search_posts(reddit, mirror_stack, to_mirror, args):
-                new_posts_len = to_mirror.qsize()
+            dispatch_posts(work_queue, to_mirror, to_comment, comment_parents, state)
+
+            if search_subreddits(reddit, cursors, polls, to_mirror, comment_parents, state,
+                                 args) and notifier is not None:
+                notifier.count("found", to_mirror.qsize())
+
+            dispatch_posts(work_queue, to_mirror, to_comment, comment_parents, state)
+            sleep(polls.wait_time())
 
-                if discord is not None:
-                    assert rest is not None and gateway is not None and \
-                        owner_dm_channel is not None
+    finally:
+        state.close()
 
-                    rest.post_message(owner_dm_channel["id"],
-                                      content=f"Found new posts {new_posts_len} to mirror!")
 
-                mirror_posts(vhp, to_mirror, to_comment, args)
-                comment_mirrors(reddit, to_comment)
+def run_role(reddit: OAuth2Client, vhp: VHPClient, args: Namespace,
+             discord: tuple[REST, Gateway] | None = None, discord_owner_id: str | None = None):
+    if args.incremental_comments:
+        raise ValueError("Incremental comments are only supported with --role all!")
 
-            if discord is not None:
-                rest.post_message(owner_dm_channel["id"],
-                                  content=f"Sleeping bot for {args.sleep_interval} seconds!")
+    work_queue = load_work_queue(args)
+    to_mirror_depth = partial(work_queue.depth, "mirror")
+    to_comment_depth = partial(work_queue.depth, "comment")
+    notifier = load_notifier(discord, discord_owner_id, to_mirror_depth, to_comment_depth, args)
+    close_metrics = load_metrics(to_mirror_depth, to_comment_depth, args)
+    keeper = LeaseKeeper(work_queue, args.visibility_timeout)
 
-            sleep(args.sleep_interval)
+    try:
+        if args.role == "poller":
+            run_poller(reddit, work_queue, args, notifier=notifier)
+
+        elif args.role == "mirror":
+            run_mirror_worker(vhp, work_queue, keeper, args, notifier=notifier)
+
+        else:
+            run_commenter(reddit, work_queue, keeper, args, notifier=notifier)
 
     except KeyboardInterrupt:
-        if discord is not None:
-            rest.post_message(owner_dm_channel["id"], content="Shutting bot down!")
+        if notifier is not None:
+            notifier.message(f"Shutting {args.role} down!")
+
+    finally:
+        keeper.close()
+
+        if notifier is not None:
+            notifier.close()
 
-        comment_mirrors(reddit, to_comment)
+        close_metrics()
+        work_queue.close()
 
 
-def search_posts(reddit: OAuth2Client, mirror_stack: deque[str],
-                 to_mirror: Queue[tuple[LinkThing, int, datetime | None]], args: Namespace):
-    if not args.before:
-        args.before = get_subreddit_latest_post_name(reddit, args)
+def search_posts(reddit: OAuth2Client, cursor: SubredditCursor, polls: PollScheduler,
+                 to_mirror: MirrorQueue, comment_parents: dict[str, str], state: StateStore,
+                 args: Namespace, on_queued: Callable[[], None] | None = None):
+    subreddit = cursor["subreddit"]
+    recent = cursor["recent"]
 
-    if check_post_deleted(reddit, args.subreddit, args.before) is True:
-        args.before = mirror_stack.pop() if len(mirror_stack) else \
-            get_subreddit_latest_post_name(reddit, args)
-        return False
+    if not cursor["before"]:
+        cursor["before"] = get_subreddit_latest_post_name(reddit, subreddit)
 
-    posts_res = reddit.posts(subreddit=args.subreddit, sort=ListingSort.NEW, before=args.before,
-                             limit=args.limit)
+    if cursor["before"] not in recent:
+        recent.append(cursor["before"])
+
+    posts_res = get_subreddit_posts(reddit, cursor, args)
     posts_json = posts_res.json()
 
-    if posts_json["data"]["dist"] != 0:
-        posts: list[LinkThing] = posts_json["data"]["children"]
+    if posts_json["data"]["dist"] == 0 or \
+            any(post["data"]["name"] in recent for post in posts_json["data"]["children"]):
+        before = validate_cursor(reddit, cursor)
 
-        for post in reversed(posts):
-            if not post["data"]["url"].startswith(("https://gfycat.com/",
-                                                   "https://imgur.com/",
-                                                   "https://streamable.com/",
-                                                   "https://streamff.com/",
-                                                   "https://streamja.com/")):
-                continue
+        if before != cursor["before"]:
+            cursor["before"] = before
+            posts_res = get_subreddit_posts(reddit, cursor, args)
+            posts_json = posts_res.json()
 
-            res = reddit.comments(post["data"]["id"], subreddit=post["data"]["subreddit"],
-                                  limit=1)
-            res_json = res.json()
+        state.save_cursor(cursor)
 
-            if len(res_json) == 2 and len(res_json[1]["data"]["children"]) == 1:
-                comment = res.json()[1]["data"]["children"][0]["data"]
+    new_posts = 0
+    pages = 1
 
-                author = comment["author"] if "author" in comment else None
-                locked = comment["locked"] if "locked" in comment else None
-                stickied = comment["stickied"] if "stickied" in comment else None
+    while True:
+        listing_full = posts_json["data"]["dist"] >= (args.limit or 25)
+        page_posts = queue_posts(reddit, cursor, posts_json["data"]["children"], to_mirror,
+                                 comment_parents, state, args)
+        new_posts += page_posts
 
-                assert author is not None, comment
-                assert locked is not None, comment
-                assert stickied is not None, comment
+        if page_posts > 0 and on_queued is not None:
+            on_queued()
 
-                if (author != "AutoModerator" or locked is True or stickied is False) \
-                        and args.skip_missing_stickied_automod:
-                    continue
+        if page_posts == 0 or not listing_full or pages >= args.max_pages:
+            break
 
-            elif args.skip_missing_stickied_automod:
-                continue
+        if to_mirror.qsize() >= args.max_backlog:
+            metrics.count("backlog_overflow", subreddit=subreddit)
+            break
 
-            to_mirror.put((post, 0, None))
+        posts_res = get_subreddit_posts(reddit, cursor, args)
+        posts_json = posts_res.json()
+        pages += 1
 
-        args.before = posts[0]["data"]["name"]
-        return to_mirror.qsize() > 0
+    polls.polled(subreddit, new_posts, listing_full, posts_res.headers)
+    return new_posts > 0 and to_mirror.qsize() > 0
 
-    return False
+
+def search_subreddits(reddit: OAuth2Client, cursors: deque[SubredditCursor],
+                      polls: PollScheduler, to_mirror: MirrorQueue,
+                      comment_parents: dict[str, str], state: StateStore, args: Namespace,
+                      on_queued: Callable[[], None] | None = None):
+    due = [cursor for cursor in cursors if polls.due(cursor["subreddit"])]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(due), args.lookup_workers))) as poll_pool:
+        searches = [poll_pool.submit(search_posts, reddit, cursor, polls, to_mirror,
+                                     comment_parents, state, args, on_queued=on_queued)
+                    for cursor in due]
+
+    cursors.rotate(-1)
+    return any([search.result() for search in searches])
+
+
+def settle_mirror(to_mirror: MirrorQueue, post: LinkThing, retries: int,
+                  mirrors: Mirrors | timedelta | None, state: StateStore | None = None,
+                  notifier: Notifier | None = None):
+    if isinstance(mirrors, timedelta):
+        try_after = to_mirror.retry(post, retries, urlparse(post["data"]["url"]).netloc,
+                                    mirrors)
+
+        if try_after is not None:
+            if state is not None:
+                state.retry_mirror(post, retries + 1, try_after)
+
+            if notifier is not None:
+                notifier.count("retried")
+
+            return None
+
+        mirrors = None
+
+    mirrors = mirrors or Mirrors()
+    to_mirror.done(post)
+
+    if notifier is not None:
+        notifier.count("mirrored" if len(mirrors) > 0 else "failed")
+
+    if state is not None:
+        state.mirrored(post, mirrors)
+
+    return mirrors
+
+
+def settle_mirror_job(work_queue: WorkQueue, lease: Lease, mirrors: Mirrors | timedelta | None,
+                      args: Namespace, notifier: Notifier | None = None):
+    job: MirrorJob = lease["payload"]
+    post = job["post"]
+
+    if isinstance(mirrors, timedelta):
+        if job["retries"] + 1 < MAX_RETRIES and \
+                time() - lease["enqueued_at"] <= args.retry_budget:
+            delay = retry_delay(job["retries"], urlparse(post["data"]["url"]).netloc, mirrors)
+            work_queue.release(lease, MirrorJob(post=post, parent_id=job["parent_id"],
+                                                retries=job["retries"] + 1),
+                               time() + delay.total_seconds())
+
+            if notifier is not None:
+                notifier.count("retried")
+
+            return
+
+        mirrors = None
+
+    mirrors = mirrors or Mirrors()
+
+    if notifier is not None:
+        notifier.count("mirrored" if len(mirrors) > 0 else "failed")
+
+    if len(mirrors) > 0:
+        work_queue.put("comment", post["data"]["name"],
+                       CommentJob(post=post, parent_id=job["parent_id"], mirrors=mirrors))
+
+    work_queue.ack(lease)
 
 
 def update_credential(reddit: OAuth2Client, args: Namespace):
@@ -626,6 +1638,47 @@ def update_credential(reddit: OAuth2Client, args: Namespace):
         dump(credential, credential_stream, separators=(",", ":"))
 
 
+def upload_media_file(host: str, upload: Callable[[MediaReader], T], args: Namespace):
+    with MediaFile(args.media_path) as media, \
+            StateStore(__config_path__.joinpath(f"{args.alias}.sqlite3")) as state:
+        digest = media.digest
+        uploaded: T | None = None if args.no_resume else state.journaled_upload(digest, host)
+
+        if uploaded is not None:
+            return digest, uploaded
+
+        with media.reader() as media_stream:
+            uploaded = upload(media_stream)
+
+        state.journal_upload(digest, host, uploaded)
+        return digest, uploaded
+
+
+def upload_mirror(host: str, vhp: VHPClient, video_stream: MediaReader | TeeReader,
+                  post: LinkThing, started: dict[str, float] | None = None):
+    if started is not None:
+        started[host] = monotonic()
+
+    with metrics.timer("upload", host=host):
+        return MIRROR_UPLOADERS[host](vhp, video_stream, post)
+
+
+def validate_cursor(reddit: OAuth2Client, cursor: SubredditCursor):
+    recent = cursor["recent"]
+    res = reddit.info(ids=list(reversed(recent)), subreddit=cursor["subreddit"])
+    children: list[LinkThing] = res.json()["data"]["children"]
+    alive = {post["data"]["name"] for post in children
+             if post["data"]["removed_by_category"] is None}
+
+    for post_name in [post_name for post_name in recent if post_name not in alive]:
+        recent.remove(post_name)
+
+    if len(recent) == 0:
+        recent.append(get_subreddit_latest_post_name(reddit, cursor["subreddit"]))
+
+    return recent[-1]
+
+
 def __program_main():
     args = parse_program_args()
 
@@ -641,27 +1694,19 @@ def __program_main():
 
     elif args.action == "post":
         reddit, vhp, discord, discord_owner_id = load_clients(args)
+        post_media(reddit, vhp, args)
 
-        if args.post_action == "reddit":
-            post_reddit(reddit, args)
-
-        else:
-            if args.post_action == "gfycat":
-                post_gfycat(reddit, vhp.gfycat, args)
-
-            elif args.post_action == "imgur":
-                post_imgur(reddit, vhp.imgur, args)
-
-            elif args.post_action == "streamable":
-                post_streamable(reddit, vhp.streamable, args)
+        if args.post_action != "reddit":
+            update_credential(reddit, args)
 
-            elif args.post_action == "streamff":
-                post_streamff(reddit, vhp.streamff, args)
+    elif args.action == "post-batch":
+        reddit, vhp, discord, discord_owner_id = load_clients(args)
 
-            elif args.post_action == "streamja":
-                post_streamja(reddit, vhp.streamja, args)
+        posted, failed = post_batch(reddit, vhp, args)
+        update_credential(reddit, args)
 
-            update_credential(reddit, args)
+        print(f"Posted: {posted}")
+        print(f"Not Posted: {failed}")
 
     elif args.action == "mirror-posts":
         reddit, vhp, discord, discord_owner_id = load_clients(args)
@@ -674,4 +1719,18 @@ def __program_main():
     elif args.action == "run-bot":
         reddit, vhp, discord, discord_owner_id = load_clients(args)
 
-        run_bot(reddit, vhp, args, discord=discord, discord_owner_id=discord_owner_id)
+        if args.role != "all":
+            run_role(reddit, vhp, args, discord=discord, discord_owner_id=discord_owner_id)
+
+        elif args.async_mode:
+            from asyncio import run as async_run
+
+            try:
+                async_run(run_bot_async(reddit, vhp, args, discord=discord,
+                                        discord_owner_id=discord_owner_id))
+
+            except KeyboardInterrupt:
+                pass
+
+        else:
+            run_bot(reddit, vhp, args, discord=discord, discord_owner_id=discord_owner_id)
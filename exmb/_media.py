@@ -0,0 +1,228 @@
+from __future__ import annotations
+from hashlib import sha256
+from io import SEEK_CUR, SEEK_END, SEEK_SET, RawIOBase
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from queue import Full, Queue
+from tempfile import TemporaryFile
+from threading import Event
+from time import monotonic
+from typing import IO
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MediaFile:
+    def __init__(self, path: Path):
+        self.__file = path.open(mode="rb")
+        self.__readers: list[MediaReader] = []
+        self.name = path.name
+        self.size = path.stat().st_size
+        self.__mmap = mmap(self.__file.fileno(), 0, access=ACCESS_READ) if self.size > 0 \
+            else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        for reader in self.__readers:
+            reader.close()
+
+        if self.__mmap is not None:
+            self.__mmap.close()
+
+        self.__file.close()
+
+    @property
+    def digest(self):
+        digest = sha256()
+
+        with self.reader() as reader:
+            while chunk := reader.read(CHUNK_SIZE):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def reader(self):
+        view = memoryview(self.__mmap if self.__mmap is not None else b"")
+        reader = MediaReader(view, self.name)
+        self.__readers.append(reader)
+        return reader
+
+
+class MediaReader(RawIOBase):
+    def __init__(self, view: memoryview, name: str):
+        super().__init__()
+        self.__position = 0
+        self.__view = view
+        self.name = name
+
+    def close(self):
+        if not self.closed:
+            self.__view.release()
+
+        super().close()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview):
+        size = min(len(buffer), len(self.__view) - self.__position)
+        buffer[:size] = self.__view[self.__position:self.__position + size]
+        self.__position += size
+        return size
+
+    def seek(self, offset: int, whence: int = SEEK_SET):
+        if whence == SEEK_CUR:
+            offset += self.__position
+
+        elif whence == SEEK_END:
+            offset += len(self.__view)
+
+        self.__position = max(0, min(offset, len(self.__view)))
+        return self.__position
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.__position
+
+
+class SourceMedia:
+    def __init__(self, name: str):
+        self.__downloaded = Event()
+        self.__file = TemporaryFile()
+        self.__mmap: mmap | None = None
+        self.__readers: list[MediaReader | TeeReader] = []
+        self.__tees: list[TeeReader] = []
+        self.digest: str | None = None
+        self.name = name
+        self.size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        for reader in self.__readers:
+            reader.close()
+
+        if self.__mmap is not None:
+            self.__mmap.close()
+
+        self.__file.close()
+
+    def download(self, stream: IO[bytes]):
+        assert not self.__downloaded.is_set()
+        digest = sha256()
+
+        try:
+            while chunk := stream.read(CHUNK_SIZE):
+                digest.update(chunk)
+                self.__file.write(chunk)
+
+                for tee in self.__tees:
+                    tee.feed(chunk)
+
+        except BaseException as ex:
+            for tee in self.__tees:
+                tee.feed(ex)
+
+            raise ex
+
+        for tee in self.__tees:
+            tee.feed(None)
+
+        self.__file.flush()
+        self.digest = digest.hexdigest()
+        self.size = self.__file.tell()
+
+        if self.size > 0:
+            self.__mmap = mmap(self.__file.fileno(), 0, access=ACCESS_READ)
+
+        self.__downloaded.set()
+
+    def reader(self):
+        assert self.__downloaded.is_set()
+
+        view = memoryview(self.__mmap if self.__mmap is not None else b"")
+        reader = MediaReader(view, self.name)
+        self.__readers.append(reader)
+        return reader
+
+    def tee(self, buffer_chunks: int, timeout: float | None = None):
+        assert not self.__downloaded.is_set()
+
+        tee = TeeReader(self.name, buffer_chunks, timeout=timeout)
+        self.__readers.append(tee)
+        self.__tees.append(tee)
+        return tee
+
+
+class TeeReader(RawIOBase):
+    def __init__(self, name: str, buffer_chunks: int, timeout: float | None = None):
+        super().__init__()
+        self.__chunks: Queue[bytes | BaseException | None] = Queue(maxsize=buffer_chunks)
+        self.__deadline = monotonic() + timeout if timeout is not None else None
+        self.__detached = False
+        self.__eof = False
+        self.__pending = memoryview(b"")
+        self.name = name
+
+    def __detach(self, ex: BaseException):
+        self.__detached = True
+
+        while self.__chunks.qsize() > 0:
+            self.__chunks.get_nowait()
+
+        if not self.__eof:
+            try:
+                self.__chunks.put_nowait(ex)
+
+            except Full:
+                pass
+
+    def close(self):
+        self.__detach(ValueError("I/O operation on closed file."))
+        super().close()
+
+    def feed(self, chunk: bytes | BaseException | None):
+        if self.__detached:
+            return
+
+        try:
+            self.__chunks.put(chunk, timeout=max(0., self.__deadline - monotonic())
+                              if self.__deadline is not None else None)
+
+        except Full:
+            self.__detach(TimeoutError("Upload stopped reading source media!"))
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview):
+        while len(self.__pending) == 0 and not self.__eof:
+            chunk = self.__chunks.get()
+
+            if isinstance(chunk, TimeoutError):
+                raise chunk
+
+            if isinstance(chunk, BaseException):
+                raise IOError("Source media download failed!") from chunk
+
+            if chunk is None:
+                self.__eof = True
+
+            else:
+                self.__pending = memoryview(chunk)
+
+        size = min(len(buffer), len(self.__pending))
+        buffer[:size] = self.__pending[:size]
+        self.__pending = self.__pending[size:]
+        return size
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from bisect import bisect_left
+from contextlib import contextmanager
+from json import dump
+from pathlib import Path
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Callable
+
+LATENCY_BUCKETS = (.05, .1, .25, .5, 1., 2.5, 5., 10., 30., 60., 120., 300., 900., 3600.)
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.__buckets = buckets
+        self.__counters: dict[str, dict[Labels, float]] = {}
+        self.__gauges: dict[str, Callable[[], float]] = {}
+        self.__histograms: dict[str, dict[Labels, tuple[list[int], float, int]]] = {}
+        self.__lock = Lock()
+
+    def count(self, name: str, n: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+
+        with self.__lock:
+            counter = self.__counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + n
+
+    def gauge(self, name: str, value: Callable[[], float]):
+        with self.__lock:
+            self.__gauges[name] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+
+        with self.__lock:
+            histogram = self.__histograms.setdefault(name, {})
+            buckets, total, samples = histogram.get(key, ([0] * len(self.__buckets), 0., 0))
+
+            for index in range(bisect_left(self.__buckets, value), len(self.__buckets)):
+                buckets[index] += 1
+
+            histogram[key] = (buckets, total + value, samples + 1)
+
+    def render(self):
+        lines: list[str] = []
+
+        with self.__lock:
+            for name, counter in sorted(self.__counters.items()):
+                lines.append(f"# TYPE exmb_{name}_total counter")
+                lines.extend(f"exmb_{name}_total{format_labels(key)} {value}"
+                             for key, value in sorted(counter.items()))
+
+            for name, value in sorted(self.__gauges.items()):
+                lines.append(f"# TYPE exmb_{name} gauge")
+                lines.append(f"exmb_{name} {value()}")
+
+            for name, histogram in sorted(self.__histograms.items()):
+                lines.append(f"# TYPE exmb_{name}_seconds histogram")
+
+                for key, (buckets, total, samples) in sorted(histogram.items()):
+                    lines.extend(f"exmb_{name}_seconds_bucket" +
+                                 f"{format_labels(key + (('le', str(bound)),))} {bucket}"
+                                 for bound, bucket in zip(self.__buckets, buckets))
+                    lines.append(f"exmb_{name}_seconds_bucket" +
+                                 f"{format_labels(key + (('le', '+Inf'),))} {samples}")
+                    lines.append(f"exmb_{name}_seconds_sum{format_labels(key)} {total}")
+                    lines.append(f"exmb_{name}_seconds_count{format_labels(key)} {samples}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+
+    def snapshot(self):
+        with self.__lock:
+            return {
+                "counters": {name: [{"labels": dict(key), "value": value}
+                                    for key, value in counter.items()]
+                             for name, counter in self.__counters.items()},
+                "gauges": {name: value() for name, value in self.__gauges.items()},
+                "histograms": {name: [{"labels": dict(key), "buckets": dict(zip(
+                    map(str, self.__buckets), buckets)), "sum": total, "count": samples}
+                    for key, (buckets, total, samples) in histogram.items()]
+                    for name, histogram in self.__histograms.items()},
+            }
+
+    def start_dump(self, path: Path, interval: float):
+        stop = Event()
+
+        def dump_metrics():
+            while not stop.wait(interval):
+                self.write(path)
+
+            self.write(path)
+
+        thread = Thread(target=dump_metrics, name="metrics-dump", daemon=True)
+        thread.start()
+        return stop, thread
+
+    @contextmanager
+    def timer(self, name: str, **labels: str):
+        outcome = {"outcome": "ok"}
+        start = monotonic()
+
+        try:
+            yield outcome
+
+        except BaseException as ex:
+            outcome["outcome"] = "error"
+            raise ex
+
+        finally:
+            self.observe(name, monotonic() - start, **labels, **outcome)
+
+    def write(self, path: Path):
+        temp_path = path.with_name(f"{path.name}.tmp")
+
+        with temp_path.open(mode="w") as metrics_stream:
+            dump(self.snapshot(), metrics_stream, indent=4)
+
+        temp_path.replace(path)
+
+
+def format_labels(labels: Labels):
+    if len(labels) == 0:
+        return ""
+
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+metrics = Metrics()
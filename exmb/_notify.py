@@ -0,0 +1,133 @@
+from __future__ import annotations
+from collections import Counter, deque
+from sys import stderr
+from threading import Condition, Thread
+from time import monotonic
+from typing import Callable
+
+from exdc.client import REST
+from exdc.exception import RESTException
+from httpx import TransportError
+
+from ._schedule import MAX_RETRIES, backoff
+
+DIGEST_EVENTS = ("found", "mirrored", "retried", "failed", "commented")
+RETRY_BASE = 1.
+RETRY_CAP = 60.
+
+
+class Notifier:
+    def __init__(self, rest: REST, channel_id: str, interval: float,
+                 depths: dict[str, Callable[[], int]] | None = None):
+        self.__bucket_reset = 0.
+        self.__channel_id = channel_id
+        self.__closed = False
+        self.__condition = Condition()
+        self.__depths = depths or {}
+        self.__digest_at = monotonic() + interval
+        self.__events: Counter[str] = Counter()
+        self.__failures = 0
+        self.__interval = interval
+        self.__messages: deque[str] = deque()
+        self.__rest = rest
+        self.__sender = Thread(target=self.__send_messages, name="notifier", daemon=True)
+        self.__sender.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __digest(self):
+        if len(self.__events) == 0:
+            return None
+
+        events = ", ".join(f"{self.__events[event]} {event}" for event in DIGEST_EVENTS
+                           if self.__events[event] > 0)
+        depths = ", ".join(f"{name} {depth()}" for name, depth in self.__depths.items())
+        self.__events.clear()
+        return f"Posts {events}" + (f" (queued: {depths})" if depths else "") + "!"
+
+    def __post(self, content: str):
+        try:
+            res = self.__rest.post_message(self.__channel_id, content=content)
+
+        except RESTException as ex:
+            if ex.response.status_code != 429:
+                print(f"Dropped notification: {ex!r}", file=stderr)
+                return
+
+            headers = ex.response.headers
+            reset_after = float(headers.get("X-RateLimit-Reset-After",
+                                            headers.get("Retry-After", 1)))
+
+            with self.__condition:
+                self.__bucket_reset = monotonic() + reset_after
+                self.__messages.appendleft(content)
+
+        except TransportError as ex:
+            self.__failures += 1
+
+            if self.__failures > MAX_RETRIES:
+                print(f"Dropped notification after {MAX_RETRIES} retries: {ex!r}", file=stderr)
+                self.__failures = 0
+                return
+
+            print(f"Notification failed, retrying: {ex!r}", file=stderr)
+
+            with self.__condition:
+                self.__bucket_reset = monotonic() + backoff(self.__failures - 1, RETRY_BASE,
+                                                            RETRY_CAP)
+                self.__messages.appendleft(content)
+
+        else:
+            self.__failures = 0
+
+            if res.headers.get("X-RateLimit-Remaining") == "0":
+                with self.__condition:
+                    self.__bucket_reset = monotonic() + \
+                        float(res.headers.get("X-RateLimit-Reset-After", 0))
+
+    def __send_messages(self):
+        while True:
+            with self.__condition:
+                while True:
+                    now = monotonic()
+
+                    if now >= self.__digest_at:
+                        self.__digest_at = now + self.__interval
+
+                        if (digest := self.__digest()) is not None:
+                            self.__messages.append(digest)
+
+                    if len(self.__messages) > 0 and now >= self.__bucket_reset:
+                        content = self.__messages.popleft()
+                        break
+
+                    if len(self.__messages) == 0 and self.__closed:
+                        return
+
+                    self.__condition.wait((self.__bucket_reset if len(self.__messages) > 0
+                                           else self.__digest_at) - now)
+
+            self.__post(content)
+
+    def close(self):
+        with self.__condition:
+            if (digest := self.__digest()) is not None:
+                self.__messages.append(digest)
+
+            self.__closed = True
+            self.__condition.notify_all()
+
+        self.__sender.join()
+
+    def count(self, event: str, n: int = 1):
+        with self.__condition:
+            self.__events[event] += n
+
+    def message(self, content: str):
+        with self.__condition:
+            self.__messages.append(content)
+            self.__condition.notify_all()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from threading import Condition, Lock
+from time import monotonic, sleep
+from typing import Any, Mapping
+
+from exrc import LinkThing, OAuth2Client
+from httpx import Response
+
+INFO_MAX_IDS = 100
+
+
+class InfoResponse:
+    def __init__(self, res: Response, children: list[LinkThing]):
+        self.__children = children
+        self.headers = res.headers
+        self.status_code = res.status_code
+
+    def json(self):
+        listing: dict[str, Any] = {"kind": "Listing",
+                                   "data": {"after": None, "before": None,
+                                            "dist": len(self.__children),
+                                            "children": self.__children}}
+        return listing
+
+
+class RateLimitedClient(OAuth2Client):
+    def __init__(self, *args, info_window: float = .05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__bucket = TokenBucket()
+        self.__info_batch: list[tuple[list[str], Future[Response | InfoResponse]]] = []
+        self.__info_lock = Lock()
+        self.__info_window = info_window
+
+    def _request(self, method: str, url: str, **kwargs):
+        self.__bucket.acquire()
+
+        try:
+            res: Response = super()._request(method, url, **kwargs)
+
+        finally:
+            self.__bucket.release()
+
+        self.__bucket.update(res.headers)
+        return res
+
+    def __info_lookup(self, batch: list[tuple[list[str], Future[Response | InfoResponse]]]):
+        names = list(dict.fromkeys(name for ids, _ in batch for name in ids))
+        children: dict[str, LinkThing] = {}
+
+        for index in range(0, max(1, len(names)), INFO_MAX_IDS):
+            res = super().info(ids=names[index:index + INFO_MAX_IDS])
+            children |= {child["data"]["name"]: child
+                         for child in res.json()["data"]["children"]}
+
+        for ids, future in batch:
+            future.set_result(InfoResponse(res, [children[name] for name in ids
+                                                 if name in children]))
+
+    def info(self, ids: list[str] | None = None, sr_names: list[str] | None = None,
+             url: str | None = None, subreddit: str | None = None):
+        if ids is None or sr_names is not None or url is not None:
+            return super().info(ids=ids, sr_names=sr_names, url=url, subreddit=subreddit)
+
+        future: Future[Response | InfoResponse] = Future()
+
+        with self.__info_lock:
+            self.__info_batch.append((ids, future))
+            leader = len(self.__info_batch) == 1
+
+        if leader:
+            sleep(self.__info_window)
+
+            with self.__info_lock:
+                batch, self.__info_batch = self.__info_batch, []
+
+            try:
+                self.__info_lookup(batch)
+
+            except Exception as ex:
+                for _, batch_future in batch:
+                    if not batch_future.done():
+                        batch_future.set_exception(ex)
+
+        return future.result()
+
+
+class TokenBucket:
+    def __init__(self, capacity: float = 600., period: float = 600., reserve: float = .1):
+        self.__capacity = capacity
+        self.__condition = Condition()
+        self.__in_flight = 0
+        self.__next_at = 0.
+        self.__period = period
+        self.__reserve = reserve
+        self.__reset_at = monotonic() + period
+        self.__tokens = capacity
+
+    def acquire(self):
+        with self.__condition:
+            while True:
+                now = monotonic()
+
+                if now >= self.__reset_at:
+                    self.__reset_at = now + self.__period
+                    self.__tokens = self.__capacity
+
+                if self.__tokens >= 1 and now >= self.__next_at:
+                    self.__in_flight += 1
+                    self.__tokens -= 1
+
+                    if self.__tokens < self.__capacity * self.__reserve:
+                        self.__next_at = now + (self.__reset_at - now) / max(1., self.__tokens)
+
+                    return
+
+                self.__condition.wait((self.__next_at if self.__tokens >= 1
+                                       else self.__reset_at) - now)
+
+    def release(self):
+        with self.__condition:
+            self.__in_flight -= 1
+            self.__condition.notify_all()
+
+    def update(self, headers: Mapping[str, str]):
+        if "X-Ratelimit-Remaining" not in headers or "X-Ratelimit-Reset" not in headers:
+            return
+
+        remaining = float(headers["X-Ratelimit-Remaining"])
+        reset = float(headers["X-Ratelimit-Reset"])
+
+        with self.__condition:
+            self.__capacity = remaining + float(headers.get("X-Ratelimit-Used", 0))
+            self.__period = reset
+            self.__reset_at = monotonic() + reset
+            self.__tokens = remaining - self.__in_flight
+            self.__condition.notify_all()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+from datetime import timedelta
+from importlib.metadata import entry_points
+from re import Pattern, compile as re_compile
+from threading import Lock
+from typing import Callable
+
+from exvhp import VHPClient
+from httpx import HTTPStatusError
+
+Resolver = Callable[[VHPClient, str], str | timedelta | None]
+
+
+class ResolverRegistry:
+    def __init__(self):
+        self.__dispatcher: Pattern[str] | None = None
+        self.__lock = Lock()
+        self.__plugins_loaded = False
+        self.__resolvers: list[tuple[str, str, Resolver]] = []
+
+    def __compile(self):
+        with self.__lock:
+            if not self.__plugins_loaded:
+                self.__plugins_loaded = True
+
+                for entry_point in entry_points(group="exmb.resolvers"):
+                    entry_point.load()(self)
+
+            if self.__dispatcher is None:
+                self.__dispatcher = re_compile("|".join(f"(?P<r{index}>{pattern})" for index,
+                                                        (_, pattern, _)
+                                                        in enumerate(self.__resolvers)))
+
+            return self.__dispatcher
+
+    def match(self, url: str):
+        match = self.__compile().match(url)
+
+        if match is None or match.lastgroup is None:
+            return None
+
+        host, _, resolver = self.__resolvers[int(match.lastgroup[1:])]
+        return host, resolver, match.group(match.lastindex + 1)
+
+    def register(self, host: str, pattern: str):
+        assert re_compile(pattern).groups == 1, pattern
+
+        def decorator(resolver: Resolver):
+            self.__resolvers.append((host, pattern, resolver))
+            self.__dispatcher = None
+            return resolver
+
+        return decorator
+
+    def resolve(self, vhp: VHPClient, url: str):
+        match = self.match(url)
+
+        if match is None:
+            return None
+
+        _, resolver, media_id = match
+        return resolver(vhp, media_id)
+
+
+resolvers = ResolverRegistry()
+
+
+@resolvers.register("gfycat", r"https://gfycat\.com/(.+)")
+def resolve_gfycat(vhp: VHPClient, gfyname: str):
+    upload_status = vhp.gfycat.get_upload_status(gfyname)
+
+    if upload_status["task"] != "complete":
+        if "time" in upload_status:
+            return timedelta(seconds=upload_status["time"])
+
+        return None
+
+    return vhp.gfycat.get_post_info(gfyname)["gfyItem"]["mp4Url"]
+
+
+@resolvers.register("imgur", r"https://imgur\.com/a/(.+)")
+def resolve_imgur_album(vhp: VHPClient, album_id: str):
+    return None
+
+
+@resolvers.register("imgur", r"https://imgur\.com/(.+)")
+def resolve_imgur(vhp: VHPClient, media_id: str):
+    try:
+        return vhp.imgur.get_media(media_id)["media"][0]["url"]
+
+    except HTTPStatusError as ex:
+        if ex.response.status_code == 404:
+            return None
+
+        raise ex
+
+
+@resolvers.register("streamable", r"https://streamable\.com/(.+)")
+def resolve_streamable(vhp: VHPClient, video_id: str):
+    if not vhp.streamable.is_video_available(video_id):
+        return None
+
+    if vhp.streamable.is_video_processing(video_id):
+        return timedelta(seconds=10)
+
+    return vhp.streamable.get_video_url(video_id)
+
+
+@resolvers.register("streamff", r"https://streamff\.com/(v/.+)")
+def resolve_streamff(vhp: VHPClient, video_id: str):
+    video_link = vhp.streamff.get_video_data(video_id)["videoLink"]
+    return f"https://streamff.com{video_link}"
+
+
+@resolvers.register("streamja", r"https://streamja\.com/(?:embed/)?(.+)")
+def resolve_streamja(vhp: VHPClient, video_id: str):
+    if not vhp.streamja.is_video_available(video_id):
+        return None
+
+    if vhp.streamja.is_video_processing(video_id):
+        return timedelta(seconds=10)
+
+    return vhp.streamja.get_video_url(video_id)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from heapq import heappop, heappush
+from itertools import count
+from queue import Queue
+from random import uniform
+from sys import stderr
+from threading import Condition, Event, Lock, Thread
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Callable, Generic, Mapping, TypeVar
+
+if TYPE_CHECKING:
+    from exrc import LinkThing
+
+RETRY_BACKOFF: dict[str, tuple[timedelta, timedelta]] = {
+    "gfycat.com": (timedelta(seconds=5), timedelta(minutes=2)),
+    "streamable.com": (timedelta(seconds=10), timedelta(minutes=3)),
+    "streamja.com": (timedelta(seconds=10), timedelta(minutes=3)),
+}
+MAX_RETRIES = 5
+T = TypeVar("T")
+
+
+class PollCancelled(Exception):
+    def __init__(self, polls: int):
+        super().__init__(f"Polling cancelled after {polls} polls!")
+        self.polls = polls
+
+
+class Debouncer(Generic[T]):
+    def __init__(self, flush: Callable[[T], None], interval: float):
+        self.__condition = Condition()
+        self.__flush = flush
+        self.__flushed_at: dict[str, float] = {}
+        self.__flushing: set[str] = set()
+        self.__interval = interval
+        self.__pending: dict[str, T] = {}
+        self.__flusher = Thread(target=self.__flush_pending, name="debouncer", daemon=True)
+        self.__flusher.start()
+
+    def __flush_pending(self):
+        while True:
+            with self.__condition:
+                while True:
+                    now = monotonic()
+                    ready = [key for key in self.__pending
+                             if self.__flushed_at.get(key, 0.) + self.__interval <= now]
+
+                    if len(ready) > 0:
+                        key = ready[0]
+                        value = self.__pending.pop(key)
+                        self.__flushing.add(key)
+                        break
+
+                    self.__condition.wait(min((self.__flushed_at[key] + self.__interval - now
+                                               for key in self.__pending), default=None))
+
+            try:
+                self.__flush(value)
+
+            except Exception as ex:
+                print(f"Flushing {key} failed: {ex!r}", file=stderr)
+
+            finally:
+                with self.__condition:
+                    self.__flushed_at[key] = monotonic()
+                    self.__flushing.discard(key)
+                    self.__condition.notify_all()
+
+    def cancel(self, key: str):
+        with self.__condition:
+            self.__pending.pop(key, None)
+            self.__condition.wait_for(lambda: key not in self.__flushing)
+            self.__flushed_at.pop(key, None)
+
+    def push(self, key: str, value: T):
+        with self.__condition:
+            self.__pending[key] = value
+            self.__condition.notify_all()
+
+
+class MirrorQueue(Queue["tuple[LinkThing, int, datetime | None]"]):
+    def __init__(self, max_retries: int = MAX_RETRIES,
+                 retry_budget: timedelta = timedelta(minutes=15)):
+        super().__init__()
+        self.__first_try: dict[str, datetime] = {}
+        self.__max_retries = max_retries
+        self.__retry_budget = retry_budget
+
+    def _init(self, maxsize: int):
+        self.queue: list[tuple[datetime, int, tuple[LinkThing, int, datetime | None]]] = []
+        self.__order = count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item: tuple[LinkThing, int, datetime | None]):
+        post, retries, try_after = item
+
+        if retries == 0:
+            self.__first_try.setdefault(post["data"]["name"], datetime.now(tz=timezone.utc))
+
+        ready_at = try_after or datetime.min.replace(tzinfo=timezone.utc)
+        heappush(self.queue, (ready_at, next(self.__order), item))
+
+    def _get(self):
+        return heappop(self.queue)[2]
+
+    def done(self, post: LinkThing):
+        with self.mutex:
+            self.__first_try.pop(post["data"]["name"], None)
+
+    def ready_in(self):
+        with self.mutex:
+            if len(self.queue) == 0:
+                return None
+
+            return max(0., (self.queue[0][0] - datetime.now(tz=timezone.utc)).total_seconds())
+
+    def restore(self, post: LinkThing, retries: int, try_after: datetime | None,
+                first_try: datetime | None):
+        if first_try is not None:
+            with self.mutex:
+                self.__first_try[post["data"]["name"]] = first_try
+
+        self.put((post, retries, try_after))
+
+    def retry(self, post: LinkThing, retries: int, host: str, delay: timedelta):
+        now = datetime.now(tz=timezone.utc)
+
+        with self.mutex:
+            first_try = self.__first_try.get(post["data"]["name"], now)
+
+        if retries + 1 >= self.__max_retries or now - first_try > self.__retry_budget:
+            self.done(post)
+            return None
+
+        try_after = now + retry_delay(retries, host, delay)
+        self.put((post, retries + 1, try_after))
+        return try_after
+
+
+class PollScheduler:
+    def __init__(self, interval: float, min_interval: float, max_interval: float):
+        self.__interval = interval
+        self.__intervals: dict[str, float] = {}
+        self.__lock = Lock()
+        self.__max_interval = max_interval
+        self.__min_interval = min_interval
+        self.__poll_at: dict[str, float] = {}
+        self.__quota_interval = 0.
+
+    def due(self, subreddit: str):
+        with self.__lock:
+            return self.__poll_at.get(subreddit, 0.) <= monotonic()
+
+    def polled(self, subreddit: str, new_posts: int, listing_full: bool,
+               headers: Mapping[str, str]):
+        with self.__lock:
+            interval = self.__intervals.get(subreddit, self.__interval)
+
+            if listing_full:
+                interval = self.__min_interval
+
+            elif new_posts > 0:
+                interval = max(self.__min_interval, interval / 2)
+
+            else:
+                interval = min(self.__max_interval, interval * 2)
+
+            self.__intervals[subreddit] = interval
+
+            if "X-Ratelimit-Remaining" in headers and "X-Ratelimit-Reset" in headers:
+                remaining = float(headers["X-Ratelimit-Remaining"])
+                reset = float(headers["X-Ratelimit-Reset"])
+                self.__quota_interval = reset if remaining < 1 else \
+                    reset / remaining * len(self.__intervals)
+
+            self.__poll_at[subreddit] = monotonic() + max(interval, self.__quota_interval)
+
+    def wait_time(self):
+        with self.__lock:
+            if len(self.__poll_at) == 0:
+                return 0.
+
+            return max(0., min(self.__poll_at.values()) - monotonic())
+
+
+def backoff(attempt: int, base: float, cap: float, jitter: float = .1):
+    return min(cap, base * 2 ** attempt) * uniform(1 - jitter, 1 + jitter)
+
+
+def poll(check: Callable[[], T | timedelta | None], interval: float = 1.,
+         max_interval: float = 30., timeout: float | None = None, cancel: Event | None = None):
+    deadline = monotonic() + timeout if timeout is not None else None
+    polls = 0
+
+    while True:
+        result = check()
+        polls += 1
+
+        if result is not None and not isinstance(result, timedelta):
+            return result, polls
+
+        delay = result.total_seconds() if isinstance(result, timedelta) else \
+            backoff(polls - 1, interval, max_interval)
+
+        if deadline is not None:
+            remaining = deadline - monotonic()
+
+            if remaining <= 0:
+                raise TimeoutError(f"Polling timed out after {polls} polls!")
+
+            delay = min(delay, remaining)
+
+        if cancel is not None:
+            if cancel.wait(delay):
+                raise PollCancelled(polls)
+
+        else:
+            sleep(delay)
+
+
+def retry_delay(retries: int, host: str, delay: timedelta):
+    if host in RETRY_BACKOFF:
+        base, cap = RETRY_BACKOFF[host]
+        delay = max(delay, timedelta(seconds=backoff(retries, base.total_seconds(),
+                                                     cap.total_seconds())))
+
+    return delay
@@ -0,0 +1,188 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from json import dumps, loads
+from pathlib import Path
+from sqlite3 import connect
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+from ._type import Mirrors, SubredditCursor
+
+if TYPE_CHECKING:
+    from exrc import LinkThing
+
+
+class StateStore:
+    def __init__(self, path: Path):
+        self.__db = connect(path, check_same_thread=False)
+        self.__lock = Lock()
+
+        with self.__lock, self.__db:
+            self.__db.execute("PRAGMA journal_mode=WAL")
+            self.__db.execute("PRAGMA synchronous=NORMAL")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS cursor (subreddit TEXT PRIMARY KEY, " +
+                              "before TEXT NOT NULL)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS cursor_recent (" +
+                              "subreddit TEXT PRIMARY KEY, recent TEXT NOT NULL)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS to_mirror (name TEXT PRIMARY KEY, " +
+                              "post TEXT NOT NULL, parent_id TEXT NOT NULL, " +
+                              "retries INTEGER NOT NULL, try_after TEXT, queued_at TEXT)")
+
+            if "queued_at" not in [column[1] for column
+                                   in self.__db.execute("PRAGMA table_info(to_mirror)")]:
+                self.__db.execute("ALTER TABLE to_mirror ADD COLUMN queued_at TEXT")
+
+            self.__db.execute("CREATE TABLE IF NOT EXISTS to_comment (name TEXT PRIMARY KEY, " +
+                              "post TEXT NOT NULL, parent_id TEXT NOT NULL, " +
+                              "mirrors TEXT NOT NULL)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS mirrored (name TEXT PRIMARY KEY, " +
+                              "mirrors TEXT NOT NULL, commented_at TEXT NOT NULL)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS dispatched (name TEXT PRIMARY KEY, " +
+                              "dispatched_at TEXT NOT NULL)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS partial_comment (" +
+                              "name TEXT PRIMARY KEY, comment_name TEXT NOT NULL, " +
+                              "mirrors TEXT NOT NULL)")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS uploads (digest TEXT NOT NULL, " +
+                              "host TEXT NOT NULL, upload TEXT NOT NULL, " +
+                              "uploaded_at TEXT NOT NULL, PRIMARY KEY (digest, host))")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __save_cursor(self, cursor: SubredditCursor):
+        self.__db.execute("INSERT OR REPLACE INTO cursor VALUES (?, ?)",
+                          (cursor["subreddit"], cursor["before"]))
+        self.__db.execute("INSERT OR REPLACE INTO cursor_recent VALUES (?, ?)",
+                          (cursor["subreddit"],
+                           dumps(list(cursor["recent"]), separators=(",", ":"))))
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
+
+    def commented(self, post: LinkThing, mirrors: Mirrors):
+        with self.__lock, self.__db:
+            self.__db.execute("DELETE FROM to_comment WHERE name = ?", (post["data"]["name"],))
+            self.__db.execute("DELETE FROM partial_comment WHERE name = ?",
+                              (post["data"]["name"],))
+            self.__db.execute("INSERT OR REPLACE INTO mirrored VALUES (?, ?, ?)",
+                              (post["data"]["name"], dumps(mirrors, separators=(",", ":")),
+                               datetime.now(tz=timezone.utc).isoformat()))
+
+    def cursor(self, subreddit: str):
+        with self.__lock:
+            row = self.__db.execute("SELECT before, recent FROM cursor LEFT JOIN " +
+                                    "cursor_recent USING (subreddit) WHERE subreddit = ?",
+                                    (subreddit,)).fetchone()
+
+        if row is None:
+            return None, []
+
+        recent: list[str] = loads(row[1]) if row[1] is not None else []
+        return row[0], recent
+
+    def dispatched(self, post: LinkThing):
+        with self.__lock, self.__db:
+            self.__db.execute("DELETE FROM to_mirror WHERE name = ?", (post["data"]["name"],))
+            self.__db.execute("DELETE FROM to_comment WHERE name = ?", (post["data"]["name"],))
+            self.__db.execute("INSERT OR REPLACE INTO dispatched VALUES (?, ?)",
+                              (post["data"]["name"], datetime.now(tz=timezone.utc).isoformat()))
+
+    def forget_upload(self, digest: str, host: str):
+        with self.__lock, self.__db:
+            self.__db.execute("DELETE FROM uploads WHERE digest = ? AND host = ?", (digest, host))
+
+    def journal_upload(self, digest: str, host: str, upload: Any):
+        with self.__lock, self.__db:
+            self.__db.execute("INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?)",
+                              (digest, host, dumps(upload, separators=(",", ":")),
+                               datetime.now(tz=timezone.utc).isoformat()))
+
+    def journaled_upload(self, digest: str, host: str):
+        with self.__lock:
+            row = self.__db.execute("SELECT upload FROM uploads WHERE digest = ? AND host = ?",
+                                    (digest, host)).fetchone()
+
+        return loads(row[0]) if row is not None else None
+
+    def known(self, post_name: str):
+        with self.__lock:
+            return self.__db.execute("SELECT 1 FROM to_mirror WHERE name = :name UNION ALL " +
+                                     "SELECT 1 FROM to_comment WHERE name = :name UNION ALL " +
+                                     "SELECT 1 FROM mirrored WHERE name = :name UNION ALL " +
+                                     "SELECT 1 FROM dispatched WHERE name = :name",
+                                     {"name": post_name}).fetchone() is not None
+
+    def mirrored(self, post: LinkThing, mirrors: Mirrors):
+        with self.__lock, self.__db:
+            self.__db.execute("INSERT OR REPLACE INTO to_comment SELECT name, post, parent_id, " +
+                              "? FROM to_mirror WHERE name = ?",
+                              (dumps(mirrors, separators=(",", ":")), post["data"]["name"]))
+            self.__db.execute("DELETE FROM to_mirror WHERE name = ?", (post["data"]["name"],))
+
+    def partial_comment(self, post: LinkThing):
+        with self.__lock:
+            row = self.__db.execute("SELECT comment_name, mirrors FROM partial_comment " +
+                                    "WHERE name = ?", (post["data"]["name"],)).fetchone()
+
+        if row is None:
+            return None
+
+        comment_name: str = row[0]
+        mirrors: Mirrors = loads(row[1])
+        return comment_name, mirrors
+
+    def partially_commented(self, post: LinkThing, comment_name: str, mirrors: Mirrors):
+        with self.__lock, self.__db:
+            self.__db.execute("INSERT OR REPLACE INTO partial_comment VALUES (?, ?, ?)",
+                              (post["data"]["name"], comment_name,
+                               dumps(mirrors, separators=(",", ":"))))
+
+    def pending_comments(self):
+        with self.__lock:
+            rows = self.__db.execute("SELECT post, parent_id, mirrors FROM to_comment").fetchall()
+
+        pending: list[tuple[LinkThing, str, Mirrors]] = [
+            (loads(post), parent_id, loads(mirrors)) for post, parent_id, mirrors in rows
+        ]
+
+        return pending
+
+    def pending_mirrors(self):
+        with self.__lock:
+            rows = self.__db.execute("SELECT post, parent_id, retries, try_after, queued_at " +
+                                     "FROM to_mirror").fetchall()
+
+        pending: list[tuple[LinkThing, str, int, datetime | None, datetime | None]] = [
+            (loads(post), parent_id, retries,
+             datetime.fromisoformat(try_after) if try_after is not None else None,
+             datetime.fromisoformat(queued_at) if queued_at is not None else None)
+            for post, parent_id, retries, try_after, queued_at in rows
+        ]
+
+        return pending
+
+    def queue_mirrors(self, cursor: SubredditCursor, posts: list[tuple[LinkThing, str]]):
+        with self.__lock, self.__db:
+            queued_at = datetime.now(tz=timezone.utc).isoformat()
+            self.__db.executemany("INSERT OR IGNORE INTO to_mirror VALUES (?, ?, ?, 0, NULL, ?)",
+                                  [(post["data"]["name"], dumps(post, separators=(",", ":")),
+                                    parent_id, queued_at) for post, parent_id in posts])
+            self.__save_cursor(cursor)
+
+    def retry_mirror(self, post: LinkThing, retries: int, try_after: datetime):
+        with self.__lock, self.__db:
+            self.__db.execute("UPDATE to_mirror SET retries = ?, try_after = ? WHERE name = ?",
+                              (retries, try_after.isoformat(), post["data"]["name"]))
+
+    def save_cursor(self, cursor: SubredditCursor):
+        with self.__lock, self.__db:
+            self.__save_cursor(cursor)
+
+    def was_commented(self, post_name: str):
+        with self.__lock:
+            return self.__db.execute("SELECT 1 FROM mirrored WHERE name = ?",
+                                     (post_name,)).fetchone() is not None
@@ -0,0 +1,30 @@
+from __future__ import annotations
+from collections import deque
+from typing import TYPE_CHECKING, NotRequired, TypedDict
+
+if TYPE_CHECKING:
+    from exrc import LinkThing
+
+
+class CommentJob(TypedDict):
+    post: LinkThing
+    parent_id: str
+    mirrors: Mirrors
+
+
+class MirrorJob(TypedDict):
+    post: LinkThing
+    parent_id: str
+    retries: int
+
+
+class Mirrors(TypedDict):
+    streamable: NotRequired[str]
+    streamff: NotRequired[str]
+    streamja: NotRequired[str]
+
+
+class SubredditCursor(TypedDict):
+    subreddit: str
+    before: str | None
+    recent: deque[str]
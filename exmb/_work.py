@@ -0,0 +1,227 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from json import dumps, loads
+from pathlib import Path
+from sqlite3 import connect
+from threading import Event, Lock, Thread
+from time import time
+from typing import Any, Callable, TypedDict
+from uuid import uuid4
+
+
+class Lease(TypedDict):
+    topic: str
+    key: str
+    payload: Any
+    attempts: int
+    enqueued_at: float
+    token: str
+
+
+class WorkQueue(ABC):
+    @abstractmethod
+    def ack(self, lease: Lease):
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def depth(self, topic: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def extend(self, lease: Lease, visibility_timeout: float):
+        raise NotImplementedError
+
+    @abstractmethod
+    def lease(self, topic: str, visibility_timeout: float):
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, topic: str, key: str, payload: Any, available_at: float | None = None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self, lease: Lease, payload: Any, available_at: float):
+        raise NotImplementedError
+
+
+class LeaseKeeper:
+    def __init__(self, work_queue: WorkQueue, visibility_timeout: float):
+        self.__leases: dict[tuple[str, str], Lease] = {}
+        self.__lock = Lock()
+        self.__stop = Event()
+        self.__visibility_timeout = visibility_timeout
+        self.__work_queue = work_queue
+        self.__extender = Thread(target=self.__extend_leases, name="lease-keeper", daemon=True)
+        self.__extender.start()
+
+    def __extend_leases(self):
+        while not self.__stop.wait(self.__visibility_timeout / 3):
+            with self.__lock:
+                leases = list(self.__leases.values())
+
+            for lease in leases:
+                if not self.__work_queue.extend(lease, self.__visibility_timeout):
+                    self.drop(lease)
+
+    def close(self):
+        self.__stop.set()
+        self.__extender.join()
+
+        with self.__lock:
+            leases, self.__leases = list(self.__leases.values()), {}
+
+        for lease in leases:
+            self.__work_queue.release(lease, lease["payload"], time())
+
+    def drop(self, lease: Lease):
+        with self.__lock:
+            if self.__leases.get((lease["topic"], lease["key"])) is lease:
+                del self.__leases[(lease["topic"], lease["key"])]
+
+    def keep(self, lease: Lease):
+        with self.__lock:
+            self.__leases[(lease["topic"], lease["key"])] = lease
+
+
+class SQLiteWorkQueue(WorkQueue):
+    def __init__(self, path: Path, max_attempts: int = 5, retention: float = 7 * 24 * 60 * 60):
+        self.__db = connect(path, check_same_thread=False, isolation_level=None, timeout=30.)
+        self.__lock = Lock()
+        self.__max_attempts = max_attempts
+        self.__retention = retention
+
+        with self.__lock:
+            self.__db.execute("PRAGMA journal_mode=WAL")
+            self.__db.execute("PRAGMA synchronous=NORMAL")
+            self.__db.execute("CREATE TABLE IF NOT EXISTS jobs (topic TEXT NOT NULL, " +
+                              "key TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, " +
+                              "attempts INTEGER NOT NULL, enqueued_at REAL NOT NULL, " +
+                              "available_at REAL NOT NULL, token TEXT, " +
+                              "PRIMARY KEY (topic, key))")
+            self.__db.execute("CREATE INDEX IF NOT EXISTS jobs_available ON jobs " +
+                              "(topic, status, available_at)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def ack(self, lease: Lease):
+        now = time()
+
+        with self.__lock:
+            self.__db.execute("BEGIN IMMEDIATE")
+
+            try:
+                acked = self.__db.execute("UPDATE jobs SET status = 'done', available_at = ?, " +
+                                          "token = NULL WHERE topic = ? AND key = ? AND " +
+                                          "token = ?", (now, lease["topic"], lease["key"],
+                                                        lease["token"])).rowcount > 0
+                self.__db.execute("DELETE FROM jobs WHERE status IN ('done', 'dead') AND " +
+                                  "available_at < ?", (now - self.__retention,))
+                self.__db.execute("COMMIT")
+
+            except BaseException as ex:
+                self.__db.execute("ROLLBACK")
+                raise ex
+
+        return acked
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
+
+    def depth(self, topic: str):
+        with self.__lock:
+            depth: int = self.__db.execute("SELECT COUNT(*) FROM jobs WHERE topic = ? AND " +
+                                           "status IN ('ready', 'leased')",
+                                           (topic,)).fetchone()[0]
+
+        return depth
+
+    def extend(self, lease: Lease, visibility_timeout: float):
+        with self.__lock:
+            return self.__db.execute("UPDATE jobs SET available_at = ? WHERE topic = ? AND " +
+                                     "key = ? AND token = ?",
+                                     (time() + visibility_timeout, lease["topic"], lease["key"],
+                                      lease["token"])).rowcount > 0
+
+    def lease(self, topic: str, visibility_timeout: float):
+        now = time()
+        token = uuid4().hex
+
+        with self.__lock:
+            self.__db.execute("BEGIN IMMEDIATE")
+
+            try:
+                self.__db.execute("UPDATE jobs SET status = 'dead', available_at = ?, " +
+                                  "token = NULL WHERE topic = ? AND status = 'leased' AND " +
+                                  "available_at <= ? AND attempts >= ?",
+                                  (now, topic, now, self.__max_attempts))
+                row = self.__db.execute("SELECT key, payload, attempts, enqueued_at FROM jobs " +
+                                        "WHERE topic = ? AND status IN ('ready', 'leased') " +
+                                        "AND available_at <= ? ORDER BY available_at LIMIT 1",
+                                        (topic, now)).fetchone()
+
+                if row is not None:
+                    self.__db.execute("UPDATE jobs SET status = 'leased', " +
+                                      "attempts = attempts + 1, available_at = ?, token = ? " +
+                                      "WHERE topic = ? AND key = ?",
+                                      (now + visibility_timeout, token, topic, row[0]))
+
+                self.__db.execute("COMMIT")
+
+            except BaseException as ex:
+                self.__db.execute("ROLLBACK")
+                raise ex
+
+        if row is None:
+            return None
+
+        key, payload, attempts, enqueued_at = row
+        return Lease(topic=topic, key=key, payload=loads(payload), attempts=attempts + 1,
+                     enqueued_at=enqueued_at, token=token)
+
+    def put(self, topic: str, key: str, payload: Any, available_at: float | None = None):
+        now = time()
+
+        with self.__lock:
+            self.__db.execute("INSERT OR IGNORE INTO jobs VALUES (?, ?, ?, 'ready', 0, ?, ?, " +
+                              "NULL)", (topic, key, dumps(payload, separators=(",", ":")), now,
+                                        available_at or now))
+
+    def release(self, lease: Lease, payload: Any, available_at: float):
+        with self.__lock:
+            self.__db.execute("UPDATE jobs SET status = 'ready', attempts = 0, payload = ?, " +
+                              "available_at = ?, token = NULL WHERE topic = ? AND key = ? AND " +
+                              "token = ?", (dumps(payload, separators=(",", ":")), available_at,
+                                            lease["topic"], lease["key"], lease["token"]))
+
+
+def open_sqlite_work_queue(location: str, max_attempts: int = 5):
+    return SQLiteWorkQueue(Path(location), max_attempts=max_attempts)
+
+
+def open_work_queue(url: str, max_attempts: int = 5):
+    scheme, separator, location = url.partition("://")
+
+    if scheme not in work_queues:
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group="exmb.work_queues", name=scheme):
+            work_queues[scheme] = entry_point.load()
+
+    if separator == "" or scheme not in work_queues:
+        raise ValueError(f"Unsupported work queue {url}!")
+
+    return work_queues[scheme](location, max_attempts=max_attempts)
+
+
+work_queues: dict[str, Callable[..., WorkQueue]] = {
+    "sqlite": open_sqlite_work_queue,
+}